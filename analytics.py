@@ -0,0 +1,109 @@
+"""从文章文本即时计算词频和TF-IDF：多进程分词 + 稀疏(COO)词项矩阵"""
+import os
+
+import numpy as np
+import pandas as pd
+
+import metrics
+from pools import get_process_pool
+from vocab import VOCABULARY, Vocabulary
+
+# 分词进程数
+ANALYTICS_WORKERS = int(os.environ.get('DASHBOARD_ANALYTICS_WORKERS', os.cpu_count() or 1))
+
+# 单词：字母开头和结尾，中间允许连字符、点和撇号。首尾的标点不算单词的一部分（句末的点、引号），
+# 所以比 is_english_word 接受的范围窄（如 u.s. 分词为 u.s）；分词结果之后仍按有效词掩码过滤
+TOKEN_PATTERN = r"[a-z]+(?:[-.'][a-z]+)*"
+
+# 每个分词任务的最少文档数（太小时进程间传输的开销大于分词本身）
+MIN_BATCH_DOCS = 2000
+
+def tokenize_batch(texts):
+    """分词一批文本，返回 (本批词表, 文档号, 词号, 次数)，文档号从0开始"""
+    tokens = pd.Series(texts, dtype=object).fillna('').astype(str).str.lower().str.findall(TOKEN_PATTERN)
+    exploded = tokens.explode().dropna()
+    if len(exploded) == 0:
+        empty = np.array([], dtype=np.int32)
+        return [], empty, empty, empty
+    term_ids, vocabulary = pd.factorize(exploded, sort=False)
+    doc_ids = exploded.index.to_numpy(dtype=np.int64)
+    # 同一文档中的同一单词合并为一个非零元素
+    pairs, counts = np.unique(doc_ids * len(vocabulary) + term_ids, return_counts=True)
+    return (vocabulary.tolist(), (pairs // len(vocabulary)).astype(np.int32),
+            (pairs % len(vocabulary)).astype(np.int32), counts.astype(np.int32))
+
+def tokenize_texts(texts, max_workers=ANALYTICS_WORKERS):
+    """分词文本列表，文本足够多时按批分给进程池；按顺序返回每批的分词结果和文档号偏移"""
+    batch_size = max(MIN_BATCH_DOCS, -(-len(texts) // max(1, max_workers)))
+    starts = list(range(0, len(texts), batch_size))
+    batches = [texts[start:start + batch_size] for start in starts]
+    if max_workers <= 1 or len(batches) <= 1:
+        return list(zip(starts, map(tokenize_batch, batches)))
+    return list(zip(starts, get_process_pool(min(max_workers, len(batches))).map(tokenize_batch, batches)))
+
+class TermMatrix:
+    """文档 × 单词 的稀疏计数矩阵（COO格式），可以按块追加文档
+
+    词号是矩阵自己的局部词表的词号：正文里的拼写错误、网址片段等不进入进程内的全局词表，
+    输出结果时才把留下来的单词加入 vocabulary。
+    """
+
+    def __init__(self, vocabulary=VOCABULARY):
+        self.vocabulary = vocabulary
+        self.terms = Vocabulary()
+        self.doc_ids = []
+        self.term_ids = []
+        self.counts = []
+        self.n_docs = 0
+
+    def add_texts(self, texts, max_workers=ANALYTICS_WORKERS):
+        """分词并追加一批文档"""
+        with metrics.timed('tokenize') as info:
+            for start, (words, doc_ids, term_ids, counts) in tokenize_texts(texts, max_workers):
+                # 把本批词号映射到矩阵的局部词表
+                mapping = self.terms.encode(words)
+                self.doc_ids.append(doc_ids + (self.n_docs + start))
+                self.term_ids.append(mapping[term_ids])
+                self.counts.append(counts)
+            self.n_docs += len(texts)
+            info['rows'] = len(texts)
+
+    def to_arrays(self, keep=None):
+        """返回 (局部词表大小, 文档号, 词号, 次数)；keep 为按局部词号的布尔数组，用于去掉停用词"""
+        size = len(self.terms)
+        if not self.counts:
+            empty = np.array([], dtype=np.int32)
+            return size, empty, empty, empty
+        doc_ids, term_ids, counts = (np.concatenate(parts) for parts in (self.doc_ids, self.term_ids, self.counts))
+        if keep is not None:
+            selected = keep[term_ids]
+            doc_ids, term_ids, counts = doc_ids[selected], term_ids[selected], counts[selected]
+        return size, doc_ids, term_ids, counts
+
+    def output_words(self, term_ids):
+        """局部词号 -> 全局词表上的单词分类列（只有输出的单词加入全局词表）"""
+        words = [self.terms.words[term_id] for term_id in term_ids]
+        return self.vocabulary.categorical(self.vocabulary.encode(words))
+
+def word_counts(matrix, keep=None):
+    """每个单词的总出现次数，结构与 word_frequency.csv 一致 (word, count)"""
+    size, _, term_ids, counts = matrix.to_arrays(keep)
+    totals = np.bincount(term_ids, weights=counts, minlength=size).astype(np.int64)
+    present = np.flatnonzero(totals).astype(np.int32)
+    return pd.DataFrame({'word': matrix.output_words(present), 'count': totals[present]})
+
+def tfidf_scores(matrix, keep=None):
+    """每个单词在所有文档上的平均TF-IDF，结构与 tfidf.csv 一致 (word, score)
+
+    idf = ln((1 + 文档数) / (1 + 包含该词的文档数)) + 1，每个文档的向量做L2归一化。
+    """
+    size, doc_ids, term_ids, counts = matrix.to_arrays(keep)
+    if matrix.n_docs == 0 or len(counts) == 0:
+        return pd.DataFrame({'word': pd.Series(dtype=object), 'score': pd.Series(dtype='float64')})
+    document_frequency = np.bincount(term_ids, minlength=size)
+    idf = np.log((1 + matrix.n_docs) / (1 + document_frequency)) + 1
+    weights = counts * idf[term_ids]
+    norms = np.sqrt(np.bincount(doc_ids, weights=weights ** 2, minlength=matrix.n_docs))
+    scores = np.bincount(term_ids, weights=weights / norms[doc_ids], minlength=size) / matrix.n_docs
+    present = np.flatnonzero(document_frequency).astype(np.int32)
+    return pd.DataFrame({'word': matrix.output_words(present), 'score': scores[present]})
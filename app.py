@@ -1,16 +1,6 @@
 import streamlit as st
-import pandas as pd
-import matplotlib.pyplot as plt
-from wordcloud import WordCloud
-import plotly.express as px
-from datetime import datetime, timedelta
-import re
-
-# 设置matplotlib中文字体（避免警告）
-plt.rcParams['font.family'] = ['DejaVu Sans']
-plt.rcParams['axes.unicode_minus'] = False
 
-# 页面配置
+# 页面配置；标题在导入pandas和数据管道之前先显示（首次加载时浏览器不用等这些导入）
 st.set_page_config(
     page_title="Trend Analysis Dashboard",
     page_icon="📊",
@@ -20,367 +10,205 @@ st.set_page_config(
 st.title("📊 Real-time Trend Analysis Dashboard")
 st.markdown("---")
 
-# 初始化session state
-if 'last_refresh' not in st.session_state:
-    st.session_state.last_refresh = None
-if 'data_cache' not in st.session_state:
-    st.session_state.data_cache = None
+import pandas as pd
+import json
 
-def get_english_stopwords():
-    """获取英文停用词列表"""
-    english_stopwords = {
-        # 基础冠词、连词、介词
-        'a', 'an', 'the', 'and', 'or', 'but', 'if', 'because', 'as', 'until', 'while', 
-        'of', 'at', 'by', 'for', 'with', 'about', 'against', 'between', 'into', 'through', 
-        'during', 'before', 'after', 'above', 'below', 'to', 'from', 'up', 'down', 'in', 
-        'out', 'on', 'off', 'over', 'under', 'again', 'further', 'then', 'once', 'here', 
-        'there', 'when', 'where', 'why', 'how', 'all', 'any', 'both', 'each', 'few', 
-        'more', 'most', 'other', 'some', 'such', 'no', 'nor', 'not', 'only', 'own', 
-        'same', 'so', 'than', 'too', 'very', 'can', 'will', 'just', "don't", "should", 
-        "now", "'s", "'t", "'m", "'re", "'ve", "'d", "'ll", "n't", 'be', 'is', 'are', 
-        'was', 'were', 'been', 'being', 'have', 'has', 'had', 'having', 'do', 'does', 
-        'did', 'doing', 
-        
-        # 新增连词
-        'also', 'although', 'though', 'since', 'unless', 'whether', 'while', 'whereas',
-        'therefore', 'thus', 'hence', 'consequently', 'moreover', 'furthermore', 
-        'however', 'nevertheless', 'nonetheless', 'otherwise', 'instead', 'meanwhile',
-        
-        # 时间相关词汇
-        'year', 'years', 'month', 'months', 'week', 'weeks', 'day', 'days', 'hour', 
-        'hours', 'minute', 'minutes', 'second', 'seconds', 'time', 'times', 'season',
-        'seasons', 'today', 'tomorrow',
-        'yesterday', 'now', 'then', 'when', 'before', 'after', 'during', 'while',
-        'moment', 'period', 'date', 'calendar', 'clock', 'schedule',
-        
-        # 数字和序数词
-        'one', 'two', 'three', 'four', 'five', 'six', 'seven', 'eight', 'nine', 'ten',
-        'first', 'second', 'third', 'fourth', 'fifth', 'sixth', 'seventh', 'eighth',
-        'ninth', 'tenth', 'once', 'twice', 'thrice', 'single', 'double', 'triple',
-        'number', 'numbers', 'count', 'total', 'amount', 'quantity',
-        
-        # 常见代词和人称
-        'i', 'you', 'he', 'she', 'it', 'we', 'they', 'me', 'him', 'her', 'us', 'them',
-        'my', 'your', 'his', 'its', 'our', 'their', 'mine', 'yours', 'hers', 'ours',
-        'theirs', 'myself', 'yourself', 'himself', 'herself', 'itself', 'ourselves',
-        'yourselves', 'themselves',
-        
-        # 常见助动词和情态动词
-        'may', 'might', 'must', 'shall', 'should', 'would', 'could', 'ought','said'
-        
-        # 标点符号和特殊字符
-        '', ' ', '  ', ',', '.', '!', '?', ':', ';', '-', '(', ')', 
-        '[', ']', '{', '}', '/', '\\', '|', '@', '#', '$', '%', '^', '&', '*', '+', '=', 
-        '<', '>', '~', '_', '"', "'", '`',
-        
-        # 常见无意义词汇
-        'very', 'really', 'quite', 'rather', 'pretty', 'just', 'even', 'still', 'yet',
-        'already', 'almost', 'nearly', 'hardly', 'scarcely', 'simply', 'merely',
-        'actually', 'basically', 'essentially', 'literally', 'virtually'
-    }
-    
-    # 添加单个字母
-    english_stopwords.update([chr(i) for i in range(97, 123)])
-    english_stopwords.update([chr(i) for i in range(65, 91)])
-    
-    # 添加数字
-    english_stopwords.update([str(i) for i in range(0, 100)])
-    
-    return english_stopwords
+import metrics
+from pipeline import (DATA_TYPES, TIME_WINDOWS, WEIGHT_METHODS, compare_time_windows, get_articles_by_platform_and_words,
+                      get_cached_image, get_layout, get_live_word_view, get_shared_cache, get_time_window,
+                      get_wordcloud_key, get_wordcloud_spec, generate_wordcloud, put_layout, request_refresh,
+                      start_refresh_worker, sum_time_buckets)
+from render import WORDCLOUD_PARAMS, layout_words
+from topk import top_k_rows
+# plotly.express（约0.2秒）在画图的地方才导入
 
-def is_english_word(word):
-    """检查单词是否只包含英文字母"""
-    if not isinstance(word, str):
-        return False
-    # 使用正则表达式检查是否只包含英文字母（允许连字符和撇号）
-    return bool(re.match(r'^[a-zA-Z\-\.\']+$', word))
+# 词云渲染方式：服务端PNG图片，或服务端只做布局、浏览器端绘制的可交互图
+WORDCLOUD_RENDERERS = ["Image", "Interactive"]
 
-def clean_with_stopwords(df, word_col='word'):
-    """使用停用词列表清理数据"""
-    stop_words = get_english_stopwords()
-    
-    def is_valid_word(word):
-        if pd.isna(word) or not isinstance(word, str):
-            return False
-        
-        word_clean = word.strip().lower()
-        
-        # 检查是否是停用词
-        if word_clean in stop_words:
-            return False
-        
-        # 检查是否只包含英文字母
-        if not is_english_word(word):
-            return False
-        
-        # 检查单词长度
-        if len(word_clean) <= 1:
-            return False
-        
-        # 检查是否全是特殊字符
-        if re.match(r'^[^\w\s]+$', word_clean):
-            return False
-            
-        return True
-    
-    original_count = len(df)
-    cleaned_df = df[df[word_col].apply(is_valid_word)].copy()
-    return cleaned_df, original_count - len(cleaned_df)
-
-def generate_wordcloud(df, word_col='word', weight_col='frequency', title="Word Cloud", max_words=100):
-    """生成词云图"""
+def generate_wordcloud_figure(df, word_col='word', weight_col='frequency', title="Word Cloud", max_words=100, figsize=None,
+                              layout_key=None):
+    """生成可交互的词云（Plotly散点文字图）：服务端只计算布局，文字由浏览器绘制"""
     if df is None or len(df) == 0:
         return None
+    layout_key = f"{layout_key}:interactive" if layout_key is not None else None
     try:
-        word_freq = dict(zip(df[word_col], df[weight_col]))
-        wordcloud = WordCloud(
-            width=900, height=450, background_color='white',
-            colormap='viridis', max_words=max_words, relative_scaling=0.5
-        ).generate_from_frequencies(word_freq)
+        df = top_k_rows(df, weight_col, max_words)
+        key = get_wordcloud_key(df, [word_col, weight_col], title=title, max_words=max_words, renderer='plotly')
+        
+        def render():
+            words, state = layout_words(dict(zip(df[word_col], df[weight_col])), max_words, get_layout(layout_key))
+            put_layout(layout_key, state)
+            return json.dumps(words).encode()
         
-        fig, ax = plt.subplots(figsize=(8, 4))
-        ax.imshow(wordcloud, interpolation='bilinear')
-        ax.axis('off')
-        ax.set_title(title, fontsize=16, pad=20)
-        return fig
+        # 布局结果（JSON）和PNG共用同一个LRU缓存
+        layout = json.loads(get_cached_image(key, render))
     except Exception as e:
         st.error(f"Error generating wordcloud: {e}")
         return None
+    
+    import plotly.express as px
+    layout_df = pd.DataFrame(layout, columns=['word', 'weight', 'x', 'y', 'size', 'color'])
+    fig = px.scatter(layout_df, x='x', y='y', text='word', title=title,
+                     hover_data={'word': True, 'weight': ':.4g', 'x': False, 'y': False})
+    fig.update_traces(mode='text', textfont={'size': layout_df['size'].tolist(), 'color': layout_df['color'].tolist(),
+                                             'family': 'Droid Sans Mono, monospace'})
+    fig.update_xaxes(range=[0, WORDCLOUD_PARAMS['width']], visible=False)
+    fig.update_yaxes(range=[WORDCLOUD_PARAMS['height'], 0], visible=False, scaleanchor='x')
+    fig.update_layout(width=WORDCLOUD_PARAMS['width'], height=WORDCLOUD_PARAMS['height'] + 80,
+                      plot_bgcolor=WORDCLOUD_PARAMS['background_color'], margin={'l': 0, 'r': 0, 'b': 0},
+                      dragmode=False)
+    return fig
 
-def generate_combined_wordcloud(df, word_col='word', freq_col='frequency', tfidf_col='score', title="Combined Word Cloud", max_words=100):
-    """生成结合frequency和TF-IDF的词云"""
-    if df is None or len(df) == 0:
-        return None
+def show_wordcloud(spec, renderer, key):
+    """显示词云；交互模式下返回点击选中的单词"""
+    if renderer == "Interactive":
+        fig = generate_wordcloud_figure(**spec)
+        if fig is None:
+            return []
+        event = st.plotly_chart(fig, on_select="rerun", selection_mode="points", key=key)
+        words = fig.data[0].text
+        return [words[point['point_index']] for point in event.selection.points]
+    
     try:
-        # 标准化frequency和TF-IDF分数
-        freq_values = df[freq_col].values
-        tfidf_values = df[tfidf_col].values
-        
-        # 计算综合分数（frequency * TF-IDF）
-        combined_scores = freq_values * tfidf_values
-        
-        # 创建综合权重字典
-        word_weights = dict(zip(df[word_col], combined_scores))
-        
-        wordcloud = WordCloud(
-            width=900, height=450, background_color='white',
-            colormap='viridis', max_words=max_words, relative_scaling=0.5
-        ).generate_from_frequencies(word_weights)
-        
-        fig, ax = plt.subplots(figsize=(10, 5))
-        ax.imshow(wordcloud, interpolation='bilinear')
-        ax.axis('off')
-        ax.set_title(title, fontsize=16, pad=20)
-        return fig, word_weights
+        png = generate_wordcloud(**spec)
     except Exception as e:
-        st.error(f"Error generating combined wordcloud: {e}")
-        return None, None
-
-
+        st.error(f"Error generating wordcloud: {e}")
+        return []
+    if png:
+        st.image(png, use_container_width=True)
+    return []
 
-def load_data_files():
-    """加载所有数据文件"""
-    data_files = {}
-    file_mappings = {
-    'word_freq': 'word_frequency.csv',
-    'word_freq_title': 'word_frequency_title.csv',
-    'tfidf': 'tfidf.csv',
-    'tfidf_title': 'tfidf_title.csv',
-    'articles': 'articles.csv'
-}
+def get_analysis_data():
+    """获取当前共享数据快照；只有进程启动后的第一次加载需要等待"""
+    cache = get_shared_cache()
+    start_refresh_worker()
+    if cache['snapshot'] is None:
+        with st.spinner("Loading data..."):
+            cache['ready'].wait()
+    return cache['snapshot']
 
+@st.fragment(run_every=5)
+def show_refresh_status(displayed_data):
+    """侧边栏显示后台刷新进度，新快照就绪后重新运行页面"""
+    cache = get_shared_cache()
+    if cache['snapshot'] is not displayed_data:
+        st.rerun()
     
-    for key, filename in file_mappings.items():
-        try:
-            if key == 'articles':
-                df = pd.read_csv(filename)
-                # 尝试解析时间列
-                if 'published_time' in df.columns:
-                    df['published_time'] = pd.to_datetime(df['published_time'], errors='coerce')
-            else:
-                df = pd.read_csv(filename)
-            
-            # 统一列名
-            if key in ['word_freq', 'word_freq_title'] and 'count' in df.columns:
-                df = df.rename(columns={'count': 'frequency'})
-            
-            data_files[key] = df
-            print(f"✅ Loaded {filename}")
-            
-        except FileNotFoundError:
-            print(f"❌ {filename} not found, using sample data")
-            # 创建示例数据
-            if key == 'articles':
-                data_files[key] = pd.DataFrame({
-                    'id': [1, 2, 3], 'country': ['US', 'UK', 'CA'],
-                    'platform': ['news.com', 'blog.org', 'forum.net'],
-                    'published_time': pd.to_datetime(['2025-11-13 10:00:00', '2025-11-13 11:00:00', '2025-11-13 12:00:00']),
-                    'title': ['Sample 1', 'Sample 2', 'Sample 3'],
-                    'content': ['Content 1', 'Content 2', 'Content 3'],
-                    'url': ['http://example.com/1', 'http://example.com/2', 'http://example.com/3']
-                })
-            else:
-                data_files[key] = pd.DataFrame({
-                    'word': ['technology', 'innovation', 'data', 'analysis', 'research'],
-                    'frequency' if key in ['word_freq', 'word_freq_title'] else 'score': [100, 80, 60, 40, 20]
-                })
-    
-    return data_files
+    status = cache['status']
+    if displayed_data is not None:
+        st.write(f"Last update: {displayed_data['last_update'].strftime('%H:%M:%S')}")
+    if status['running']:
+        st.progress(status['progress'], text=status['stage'])
+    elif status['error']:
+        st.error(f"Last refresh failed: {status['error']}")
+    elif status['next_refresh'] is not None:
+        st.caption(f"Next refresh: {status['next_refresh'].strftime('%H:%M:%S')}")
 
-import time
-from datetime import datetime, timedelta
+def show_refresh_button():
+    """立即刷新按钮：触发后台刷新，不等待完成"""
+    if st.button("🔄 Refresh Data Now"):
+        request_refresh()
+        st.toast("Refreshing data in the background...")
 
-def update_data_cache():
-    """更新数据缓存"""
-    with st.spinner("Loading data..."):
-        data_files = load_data_files()
-        
-        # 清理词汇数据
-        for key in ['word_freq', 'word_freq_title', 'tfidf', 'tfidf_title']:
-            if key in data_files:
-                data_files[key], removed_count = clean_with_stopwords(data_files[key])
-                print(f"Cleaned {key}: removed {removed_count} stopwords")
-        
-        # 创建分析数据词典
-        analysis_data = {
-            'word_data': {
-                'content_freq': data_files.get('word_freq'),
-                'content_tfidf': data_files.get('tfidf'),
-                'title_freq': data_files.get('word_freq_title'),
-                'title_tfidf': data_files.get('tfidf_title')
-            },
-            'platform_data': data_files.get('articles'),
-            'last_update': datetime.now(),
-            'top_words': {},
-            'top_platforms': None
-        }
-        
-        # 预计算top词汇
-        for data_type, df in analysis_data['word_data'].items():
-            if df is not None and len(df) > 0:
-                weight_col = 'frequency' if 'freq' in data_type else 'score'
-                analysis_data['top_words'][data_type] = df.nlargest(20, weight_col)
-        
-        # 预计算top平台
-        if analysis_data['platform_data'] is not None:
-            platform_counts = analysis_data['platform_data']['platform'].value_counts().reset_index()
-            platform_counts.columns = ['platform', 'count']
-            analysis_data['top_platforms'] = platform_counts
-        
-        st.session_state.analysis_data = analysis_data
-        st.session_state.last_refresh = datetime.now().strftime("%H:%M:%S")
-
-def get_articles_by_platform_and_words(platforms, top_words, articles_df, max_platforms=15):
-    """根据平台和关键词获取相关文章"""
-    result = {}
-    
-    # 获取top平台
-    top_platform_list = platforms.head(max_platforms)['platform'].tolist()
-    
-    # 获取top词汇
-    keyword_list = top_words['word'].tolist()
-    
-    for platform in top_platform_list:
-        platform_articles = articles_df[articles_df['platform'] == platform]
-        
-        relevant_articles = []
-        for _, article in platform_articles.iterrows():
-            title = str(article.get('title', ''))
-            url = article.get('url', '')
-            
-            # 将标题分割成单词列表（只匹配完整单词）
-            title_words = re.findall(r'\b\w+\b', title.lower())
-            
-            # 检查标题是否包含完整的top词汇
-            for keyword in keyword_list:
-                keyword_lower = keyword.lower()
-                if keyword_lower in title_words:
-                    relevant_articles.append({
-                        'title': title,
-                        'url': url,
-                        'matched_keyword': keyword
-                    })
-                    break  # 找到一个匹配就停止，避免重复
-        
-        if relevant_articles:
-            result[platform] = relevant_articles
-    
-    return result
+def show_admin_metrics():
+    """显示各阶段的p50/p95耗时、行数和内存，并提供Prometheus格式下载"""
+    with st.expander("🛠 Pipeline Metrics", expanded=True):
+        summary = metrics.summarize()
+        if not summary:
+            st.caption("No metrics recorded yet")
+            return
+        summary_df = pd.DataFrame(summary)
+        summary_df['memory_mb'] = summary_df['memory_bytes'] / 1024 ** 2
+        st.dataframe(summary_df[['stage', 'count', 'p50_ms', 'p95_ms', 'rows', 'memory_mb']],
+                     use_container_width=True, hide_index=True)
+        st.download_button("Download Prometheus metrics", metrics.to_prometheus(),
+                           file_name="dashboard_metrics.prom", mime="text/plain")
+        if metrics.METRICS_FILE:
+            st.caption(f"Exported to {metrics.METRICS_FILE} every {metrics.METRICS_EXPORT_INTERVAL:.0f}s")
 
 def main():
-    # 初始化session state
-    if 'analysis_data' not in st.session_state:
-        st.session_state.analysis_data = None
-    if 'last_refresh' not in st.session_state:
-        st.session_state.last_refresh = None
-    if 'cache_expiry' not in st.session_state:
-        st.session_state.cache_expiry = datetime.now()
+    # 获取共享数据快照（由后台线程定时刷新）
+    data = get_analysis_data()
+    if data is None:
+        st.error(f"Failed to load data: {get_shared_cache()['status']['error']}")
+        # 没有数据时仍然显示刷新状态和刷新按钮（后台线程会退避重试，数据就绪后页面自动重新运行）
+        with st.sidebar:
+            st.header("Control Panel")
+            show_refresh_status(data)
+            show_refresh_button()
+        st.stop()
     
     # 侧边栏
     with st.sidebar:
         st.header("Control Panel")
         
-        data_type = st.radio("Data Type", ["Content Analysis", "Title Analysis"])
-        weight_method = st.radio("Weight Method", ["Frequency", "TF-IDF", "Combined"])
+        data_type = st.radio("Data Type", DATA_TYPES)
+        weight_method = st.radio("Weight Method", WEIGHT_METHODS)
+        
+        # 时间窗口（平台分析使用按小时预聚合的桶）
+        time_window = st.radio("Time Window", list(TIME_WINDOWS))
+        custom_range = None
+        if time_window == "Custom" and len(data['daily_counts']) > 0:
+            days = data['daily_counts'].index
+            custom_range = st.date_input("Date Range", value=(days[0].date(), days[-1].date()),
+                                         min_value=days[0].date(), max_value=days[-1].date())
+        window_bounds = get_time_window(data['hourly_platforms'], time_window, custom_range)
+        
+        renderer = st.radio("Word Cloud Renderer", WORDCLOUD_RENDERERS,
+                            help="Interactive: hover for weights, click words to filter the article links")
+        
+        # 从文章即时计算词表（按所选平台和时间窗口筛选）
+        live_words = st.checkbox("Compute words from articles", help="Recompute frequency and TF-IDF "
+                                 "for the selected platforms and time window instead of the precomputed files")
+        live_platforms = []
+        if live_words and data['top_platforms'] is not None:
+            live_platforms = st.multiselect("Platforms", data['top_platforms']['platform'].tolist())
         
         # 缓存状态显示
-        if st.session_state.analysis_data:
-            last_update = st.session_state.analysis_data['last_update']
-            st.write(f"Last update: {last_update.strftime('%H:%M:%S')}")
-            
-            # 检查是否需要更新缓存（每3小时）
-            if datetime.now() > st.session_state.cache_expiry:
-                st.warning("Cache expired, refreshing data...")
-                update_data_cache()
-                st.session_state.cache_expiry = datetime.now() + timedelta(hours=3)
+        show_refresh_status(data)
+        show_refresh_button()
         
-        if st.button("🔄 Refresh Data Now"):
-            update_data_cache()
-            st.session_state.cache_expiry = datetime.now() + timedelta(hours=3)
-            st.rerun()
+        # 隐藏的管理面板：页面地址加 ?admin=1 时显示
+        if st.query_params.get('admin') == '1':
+            show_admin_metrics()
     
-    # 加载或更新数据
-    if st.session_state.analysis_data is None:
-        update_data_cache()
-        st.session_state.cache_expiry = datetime.now() + timedelta(hours=3)
-    
-    data = st.session_state.analysis_data
+    # 词表来源：刷新时加载的快照，或按筛选条件即时计算的结果
+    word_view = data
+    if live_words:
+        with st.spinner("Computing word statistics from articles..."):
+            word_view = get_live_word_view(data, data_type, live_platforms, window_bounds)
     
     # 确定当前数据源
     if data_type == "Content Analysis":
-        current_freq_data = data['word_data']['content_freq']
-        current_tfidf_data = data['word_data']['content_tfidf']
+        current_freq_data = word_view['word_data']['content_freq']
+        current_tfidf_data = word_view['word_data']['content_tfidf']
+        current_combined_data = word_view['word_data']['content_combined']
         current_data = current_freq_data if weight_method == "Frequency" else current_tfidf_data
-        top_words_key = 'content_freq' if weight_method == "Frequency" else 'content_tfidf'
+        top_words_key = {'Frequency': 'content_freq', 'TF-IDF': 'content_tfidf', 'Combined': 'content_combined'}[weight_method]
     else:
-        current_freq_data = data['word_data']['title_freq']
-        current_tfidf_data = data['word_data']['title_tfidf']
+        current_freq_data = word_view['word_data']['title_freq']
+        current_tfidf_data = word_view['word_data']['title_tfidf']
+        current_combined_data = word_view['word_data']['title_combined']
         current_data = current_freq_data if weight_method == "Frequency" else current_tfidf_data
-        top_words_key = 'title_freq' if weight_method == "Frequency" else 'title_tfidf'
-    
-    weight_col = 'frequency' if weight_method == "Frequency" else 'score'
+        top_words_key = {'Frequency': 'title_freq', 'TF-IDF': 'title_tfidf', 'Combined': 'title_combined'}[weight_method]
     
     # 主内容区 - 增加第四个标签页用于文章跳转
     tab1, tab2, tab3, tab4 = st.tabs(["☁️ Word Cloud", "📊 Platform Analysis", "📈 Data Details", "🔗 Article Links"])
     
     with tab1:
+        if live_words:
+            st.caption(f"Computed from {word_view['articles']} articles")
+        wordcloud_key = f"wordcloud_{data_type}_{weight_method}"
+        selected_words = []
         if weight_method == "Combined":
             st.header(f"{data_type} - Combined Frequency & TF-IDF Word Cloud")
-            if current_freq_data is not None and current_tfidf_data is not None:
-                merged_data = pd.merge(current_freq_data, current_tfidf_data, on='word', suffixes=('_freq', '_tfidf'))
-                combined_fig, combined_weights = generate_combined_wordcloud(
-                    merged_data, 
-                    freq_col='frequency', 
-                    tfidf_col='score',
-                    title=f"Combined Word Cloud ({data_type})"
-                )
-                if combined_fig:
-                    st.pyplot(combined_fig)
+            if current_combined_data is not None:
+                selected_words = show_wordcloud(get_wordcloud_spec(word_view, data_type, weight_method),
+                                                renderer, wordcloud_key)
                 
                 st.subheader("Top 10 Words (Combined Score)")
-                if combined_weights:
-                    top_words = sorted(combined_weights.items(), key=lambda x: x[1], reverse=True)[:10]
-                    top_df = pd.DataFrame(top_words, columns=['word', 'combined_score'])
+                if top_words_key in word_view['top_words']:
+                    top_df = word_view['top_words'][top_words_key].head(10)[['word', 'combined_score']]
                     st.dataframe(top_df, use_container_width=True)
                     
                     # 保存top词汇用于文章跳转
@@ -391,31 +219,46 @@ def main():
         else:
             st.header(f"{data_type} - {weight_method} Word Cloud")
             if current_data is not None and len(current_data) > 0:
-                wordcloud_fig = generate_wordcloud(current_data, weight_col=weight_col)
-                if wordcloud_fig:
-                    st.pyplot(wordcloud_fig)
+                selected_words = show_wordcloud(get_wordcloud_spec(word_view, data_type, weight_method),
+                                                renderer, wordcloud_key)
                 
                 st.subheader("Top 10 Words")
-                top_data = current_data.nlargest(10, weight_col)
+                top_data = word_view['top_words'][top_words_key].head(10)
                 st.dataframe(top_data, use_container_width=True)
                 
                 # 保存top词汇用于文章跳转
                 st.session_state.current_top_words = top_data
             else:
                 st.warning("No data available")
+        
+        if selected_words:
+            # 点击词云中的单词：文章跳转只按选中的单词查找
+            st.session_state.current_top_words = pd.DataFrame({'word': selected_words})
+            st.info(f"Article links filtered by: {', '.join(selected_words)}")
     
     with tab2:
         st.header("Platform Distribution")
-        if data['platform_data'] is not None and len(data['platform_data']) > 0:
+        if window_bounds is not None:
+            # 时间窗口内的平台计数：对窗口内的小时桶求和
+            window_start, window_end = window_bounds
+            platform_counts = sum_time_buckets(data['hourly_platforms'], window_start, window_end)
+            platform_counts = platform_counts.rename_axis('platform').reset_index(name='count')
+            st.caption(f"{window_start:%Y-%m-%d %H:%M} – {window_end:%Y-%m-%d %H:%M}")
+        else:
             platform_counts = data['top_platforms']
+        
+        if data['platform_data'] is not None and len(data['platform_data']) > 0 and len(platform_counts) > 0:
+            if len(platform_counts) > 5:
+                max_platforms = st.slider("Number of platforms to display", 
+                                         min_value=5, 
+                                         max_value=min(30, len(platform_counts)), 
+                                         value=min(15, len(platform_counts)))
+            else:
+                max_platforms = len(platform_counts)
             
-            max_platforms = st.slider("Number of platforms to display", 
-                                     min_value=5, 
-                                     max_value=min(30, len(platform_counts)), 
-                                     value=15)
-            
-            top_platforms = platform_counts.head(max_platforms)
+            top_platforms = top_k_rows(platform_counts, 'count', max_platforms)
             
+            import plotly.express as px
             col1, col2 = st.columns(2)
             with col1:
                 fig_pie = px.pie(
@@ -455,6 +298,22 @@ def main():
             with col_stat3:
                 st.metric("Most Frequent Platform", 
                          top_platforms.iloc[0]['platform'] if len(top_platforms) > 0 else "N/A")
+            
+            if window_bounds is not None:
+                # 趋势：当前窗口与之前同样长度窗口的对比
+                window_start, window_end = window_bounds
+                st.subheader(f"Trend vs Previous {(window_end - window_start) / pd.Timedelta(hours=1):g} Hours")
+                col_trend1, col_trend2 = st.columns(2)
+                with col_trend1:
+                    st.write("**Platforms**")
+                    platform_trend = compare_time_windows(data['hourly_platforms'], window_start, window_end, 'platform')
+                    st.dataframe(top_k_rows(platform_trend, 'change', 10), use_container_width=True)
+                with col_trend2:
+                    st.write("**Title Words**")
+                    word_trend = compare_time_windows(data['hourly_words'], window_start, window_end, 'word')
+                    st.dataframe(top_k_rows(word_trend, 'change', 10), use_container_width=True)
+        elif window_bounds is not None:
+            st.info("No articles in the selected time window")
         else:
             st.info("No article data available")
     
@@ -462,7 +321,7 @@ def main():
         st.header("Data Statistics")
         col1, col2, col3, col4 = st.columns(4)
         with col1:
-            st.metric("Last Update", st.session_state.last_refresh)
+            st.metric("Last Update", data['last_update'].strftime("%H:%M:%S"))
         with col2:
             if weight_method == "Combined":
                 data_to_count = current_freq_data if current_freq_data is not None else current_data
@@ -473,7 +332,18 @@ def main():
             st.metric("Data Type", data_type)
         with col4:
             st.metric("Weight Method", weight_method)
-    
+
+        daily_counts = data['daily_counts']
+        if len(daily_counts) > 0:
+            import plotly.express as px
+            fig_daily = px.bar(
+                daily_counts.rename_axis('date').reset_index(name='count'),
+                x='date',
+                y='count',
+                title="Articles per Day"
+            )
+            st.plotly_chart(fig_daily, use_container_width=True)
+
     with tab4:
         st.header("🔗 Relevant Articles by Platform")
         
@@ -498,7 +368,8 @@ def main():
                     relevant_articles = get_articles_by_platform_and_words(
                         top_platforms, 
                         top_words,
-                        data['platform_data']
+                        data['platform_data'],
+                        article_index=data['article_index']
                     )
                     
                     if relevant_articles:
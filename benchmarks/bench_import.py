@@ -0,0 +1,98 @@
+"""导入时间基准：用 python -X importtime 测量各模块的冷启动导入时间，并检查重依赖是否延迟导入
+
+用法:
+    python benchmarks/bench_import.py --modules pipeline export app --repeat 3 --max-ms 1500
+
+每个模块在新的子进程中导入（不共享已导入的模块），取多次运行中最短的一次，输出导入总耗时、
+进程总耗时（含解释器启动）、最慢的几个直接依赖，以及 matplotlib/wordcloud/plotly.express 是否在导入时被加载。
+导入 app 会执行页面配置和标题（无界面模式），可以看作首次显示页面之前的耗时。
+超过 --max-ms 或重依赖没有延迟导入时以非零状态退出，便于在定时任务中跟踪回归。
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 只在第一次画图/渲染时才应该导入的依赖
+DEFERRED_MODULES = ['matplotlib', 'wordcloud', 'plotly.express']
+
+
+def import_once(module):
+    """在新进程中导入模块，返回 (进程耗时秒数, [(模块, 自身微秒, 累计微秒, 层级)])，顺序与 importtime 输出相同"""
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'], cwd=ROOT,
+                            capture_output=True, text=True)
+    elapsed = time.perf_counter() - start
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{result.stderr[-2000:]}")
+    imports = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        # 名字前的缩进表示嵌套层级（顶层为1个空格）
+        imports.append((name.strip(), int(self_us), int(cumulative_us), (len(name) - len(name.lstrip())) // 2))
+    return elapsed, imports
+
+
+def summarize(module, runs, top):
+    """取最快一次运行，汇总总耗时、模块直接依赖中最慢的几个和被提前导入的重依赖"""
+    def total(imports):
+        return sum(cumulative for _, _, cumulative, level in imports if level == 0)
+
+    elapsed, imports = min(runs, key=lambda run: total(run[1]))
+    # 子模块先于父模块输出：模块那一行之前、上一个顶层模块之后的第1层就是它的直接依赖
+    dependencies, children = [], []
+    for name, _, cumulative, level in imports:
+        if level == 1:
+            children.append((name, cumulative))
+        elif level == 0:
+            if name == module:
+                dependencies = children
+            children = []
+    slowest = sorted(dependencies, key=lambda item: item[1], reverse=True)[:top]
+    return {
+        'module': module,
+        'import_ms': total(imports) / 1000,
+        'process_ms': elapsed * 1000,
+        'slowest': [(name, cumulative / 1000) for name, cumulative in slowest],
+        'eager': [name for name in DEFERRED_MODULES if name in {imported for imported, *_ in imports}],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--modules', nargs='+', default=['render', 'pipeline', 'export', 'app'])
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--top', type=int, default=5, help="每个模块显示的最慢直接依赖数")
+    parser.add_argument('--max-ms', type=float, help="导入总耗时上限（毫秒），超过时退出状态为1")
+    parser.add_argument('--json', help="把结果写入JSON文件，便于比较回归")
+    args = parser.parse_args()
+
+    results = []
+    failed = False
+    print(f"{'module':<10} {'import ms':>10} {'process ms':>11}  slowest imports / eager heavy modules")
+    for module in args.modules:
+        summary = summarize(module, [import_once(module) for _ in range(args.repeat)], args.top)
+        results.append(summary)
+        slowest = ', '.join(f"{name} {ms:.0f}" for name, ms in summary['slowest'])
+        print(f"{module:<10} {summary['import_ms']:>10.0f} {summary['process_ms']:>11.0f}  {slowest}")
+        if summary['eager']:
+            print(f"{'':<10} ⚠️ imported at startup: {', '.join(summary['eager'])}")
+            failed = True
+        if args.max_ms is not None and summary['import_ms'] > args.max_ms:
+            print(f"{'':<10} ⚠️ above the {args.max_ms:.0f} ms limit")
+            failed = True
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+"""词云布局热启动基准：数据小幅变化时，完整重新布局与从上一次布局热启动的耗时和位置稳定性
+
+用法:
+    python benchmarks/bench_layout.py --max-words 100 200 --change 0.05 --rounds 5
+
+每轮把一部分词的权重随机放大或缩小（约 ±30%），然后分别完整布局和热启动布局，
+统计耗时以及与上一次相比位置不变的词所占比例。
+"""
+import argparse
+import os
+import random
+import string
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from layout import layout_wordcloud
+from render import WORDCLOUD_PARAMS
+
+
+def make_weights(rng, size):
+    """Zipf分布的词权重"""
+    words = list({''.join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(3, 10)))
+                  for _ in range(size * 2)})[:size]
+    return {word: 1000.0 / (rank + 1) for rank, word in enumerate(words)}
+
+
+def perturb(rng, weights, change):
+    """随机改变一部分词的权重"""
+    changed = dict(weights)
+    for word in rng.sample(list(weights), max(1, int(len(weights) * change))):
+        changed[word] *= rng.uniform(0.7, 1.3)
+    return changed
+
+
+def stable_fraction(previous, current):
+    """两次布局中位置相同的词所占比例"""
+    same = sum(1 for word, slot in current['words'].items()
+               if word in previous['words'] and previous['words'][word]['position'] == slot['position'])
+    return same / max(1, len(current['words']))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--max-words', type=int, nargs='+', default=[100])
+    parser.add_argument('--change', type=float, default=0.05, help="每轮改变权重的词所占比例")
+    parser.add_argument('--rounds', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    print(f"{'max_words':>9}  {'cold (s)':>9}  {'warm (s)':>9}  {'cold stable':>11}  {'warm stable':>11}")
+    for max_words in args.max_words:
+        rng = random.Random(args.seed)
+        weights = make_weights(rng, max_words)
+        _, cold_state = layout_wordcloud(weights, max_words, **WORDCLOUD_PARAMS)
+        warm_state = cold_state
+        totals = {'cold': 0.0, 'warm': 0.0, 'cold_stable': 0.0, 'warm_stable': 0.0}
+        for _ in range(args.rounds):
+            weights = perturb(rng, weights, args.change)
+
+            start = time.perf_counter()
+            _, state = layout_wordcloud(weights, max_words, **WORDCLOUD_PARAMS)
+            totals['cold'] += time.perf_counter() - start
+            totals['cold_stable'] += stable_fraction(cold_state, state)
+            cold_state = state
+
+            start = time.perf_counter()
+            _, state = layout_wordcloud(weights, max_words, warm_state, **WORDCLOUD_PARAMS)
+            totals['warm'] += time.perf_counter() - start
+            totals['warm_stable'] += stable_fraction(warm_state, state)
+            warm_state = state
+
+        rounds = args.rounds
+        print(f"{max_words:>9}  {totals['cold'] / rounds:>9.3f}  {totals['warm'] / rounds:>9.3f}  "
+              f"{totals['cold_stable'] / rounds:>10.0%}  {totals['warm_stable'] / rounds:>10.0%}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,163 @@
+"""数据管道基准：直接调用 pipeline 模块（不启动Streamlit界面），测量各阶段的耗时和峰值内存
+
+用法:
+    python benchmarks/bench_pipeline.py --sizes 10000 100000 1000000 10000000 --json results.json
+
+每个规模用固定随机种子生成词汇表和文章表（写成与线上相同结构的CSV），然后依次测量
+load_data_files、clean_with_stopwords、update_data_cache、generate_wordcloud、
+generate_combined_wordcloud、get_articles_by_platform_and_words 和 compute_word_tables。
+每个阶段运行两次：第一次只计时，第二次用 tracemalloc 统计峰值内存（只包含Python/NumPy分配；
+tracemalloc 会让运行慢数倍，不能与计时同时进行）。每次运行前恢复相同的初始状态（进程缓存、
+全局词表和快照），不同规模和两次运行之间不会互相预热。
+"""
+import argparse
+import contextlib
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# 混入词汇表的停用词和无效词，让清理阶段有实际工作
+NOISE_WORDS = ['the', 'and', "'s", '``', '--', 'a', '2024', 'said', 'x', 'u.s.']
+
+
+def make_vocabulary(rng, size):
+    """生成由小写字母组成的随机词汇（约10%为停用词或无效词）"""
+    lengths = rng.integers(3, 11, size=size)
+    letters = rng.integers(ord('a'), ord('z') + 1, size=(size, 10), dtype=np.uint8)
+    words = [row[:n].tobytes().decode() for row, n in zip(letters, lengths)]
+    noise = rng.random(size) < 0.1
+    for i in np.flatnonzero(noise):
+        words[i] = NOISE_WORDS[i % len(NOISE_WORDS)]
+    return words
+
+
+def write_dataset(directory, size, seed):
+    """在目录中写入规模为 size 的四个词表CSV和 articles.csv"""
+    rng = np.random.default_rng(seed)
+    words = make_vocabulary(rng, size)
+    counts = np.maximum(1, (1e6 / np.arange(1, size + 1)).astype(np.int64))
+    scores = rng.random(size) / 100
+
+    for filename in ['word_frequency.csv', 'word_frequency_title.csv']:
+        pd.DataFrame({'word': words, 'count': counts}).to_csv(os.path.join(directory, filename), index=False)
+    for filename in ['tfidf.csv', 'tfidf_title.csv']:
+        pd.DataFrame({'word': words, 'score': scores}).to_csv(os.path.join(directory, filename), index=False)
+
+    # 标题只从高频词中抽取，保证文章检索有命中
+    title_vocabulary = np.array(words[:5000], dtype=object)
+    title_words = title_vocabulary[rng.zipf(1.3, size=(size, 8)) % len(title_vocabulary)]
+    platforms = np.array([f'site{i}.com' for i in range(500)], dtype=object)
+    published = pd.Timestamp('2025-11-01') + pd.to_timedelta(rng.integers(0, 30 * 24 * 3600, size=size), unit='s')
+    pd.DataFrame({
+        'id': np.arange(size),
+        'country': 'US',
+        'platform': platforms[rng.zipf(1.5, size=size) % len(platforms)],
+        'published_time': published,
+        'title': [' '.join(row) for row in title_words],
+        'content': 'lorem ipsum',
+        'url': [f'http://example.com/{i}' for i in range(size)],
+    }).to_csv(os.path.join(directory, 'articles.csv'), index=False)
+
+
+def cold_start(pipeline, keep_snapshots=True):
+    """恢复到刚启动进程的状态：清空进程缓存和全局词表，keep_snapshots=False 时同时删除快照"""
+    for cache in (pipeline.get_shared_cache, pipeline.get_image_cache, pipeline.get_live_cache):
+        cache.cache_clear()
+    pipeline.VOCABULARY.clear()
+    if not keep_snapshots:
+        shutil.rmtree(pipeline.SNAPSHOT_DIR, ignore_errors=True)
+
+
+def run_quietly(func):
+    """运行 func，不输出数据管道的加载日志，保持结果表整洁"""
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        return func()
+
+
+def measure(stage, size, func, results, setup=None):
+    """分两次运行 func：第一次计时，第二次记录 tracemalloc 峰值内存；每次运行前调用 setup"""
+    if setup is not None:
+        setup()
+    start = time.perf_counter()
+    run_quietly(func)
+    elapsed = time.perf_counter() - start
+
+    if setup is not None:
+        setup()
+    tracemalloc.start()
+    try:
+        value = run_quietly(func)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    results.append({'stage': stage, 'rows': size, 'seconds': elapsed, 'peak_mb': peak / 1024 ** 2})
+    print(f"{stage:<36} {size:>10} {elapsed:>10.3f} {peak / 1024 ** 2:>10.1f}")
+    return value
+
+
+def run(pipeline, size, seed, results):
+    """在临时目录中生成数据并测量各阶段"""
+    directory = tempfile.mkdtemp(prefix='bench_pipeline_')
+    cwd = os.getcwd()
+    try:
+        write_dataset(directory, size, seed)
+        os.chdir(directory)
+        cold = lambda: cold_start(pipeline)
+
+        data_files = measure('load_data_files', size, pipeline.load_data_files, results, cold)
+        measure('clean_with_stopwords', size, lambda: pipeline.clean_with_stopwords(data_files['tfidf']), results,
+                cold)
+
+        measure('update_data_cache (csv)', size, pipeline.update_data_cache, results,
+                lambda: cold_start(pipeline, keep_snapshots=False))
+        data = measure('update_data_cache (snapshot)', size, pipeline.update_data_cache, results, cold)
+
+        clear_images = pipeline.get_image_cache.cache_clear
+        measure('generate_wordcloud', size,
+                lambda: pipeline.generate_wordcloud(data['word_data']['content_freq']), results, clear_images)
+        measure('generate_combined_wordcloud', size,
+                lambda: pipeline.generate_combined_wordcloud(data['word_data']['content_combined']), results,
+                clear_images)
+
+        measure('get_articles_by_platform_and_words', size, lambda: pipeline.get_articles_by_platform_and_words(
+            data['top_platforms'], data['top_words']['content_freq'], data['platform_data'],
+            article_index=data['article_index']), results)
+        measure('compute_word_tables (title)', size,
+                lambda: pipeline.compute_word_tables('title', data['platform_data']), results,
+                pipeline.VOCABULARY.clear)
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 100_000])
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', help="把结果写入JSON文件，便于比较回归")
+    args = parser.parse_args()
+
+    import pipeline
+
+    results = []
+    print(f"{'stage':<36} {'rows':>10} {'seconds':>10} {'peak MB':>10}")
+    for size in args.sizes:
+        run(pipeline, size, args.seed, results)
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
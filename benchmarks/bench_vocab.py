@@ -0,0 +1,100 @@
+"""全局词表基准：四个词表用字符串列与用共享词表词号时的内存，以及 frequency×TF-IDF 连接的耗时
+
+用法:
+    python benchmarks/bench_vocab.py --sizes 100000 1000000
+
+每个规模生成 frequency 和 TF-IDF 两对词表（content/title，单词大部分重叠，顺序不同），比较
+字符串 word 列的 pd.merge 与 build_combined_table 的按词号数组连接。
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from vocab import Vocabulary
+
+
+def make_words(rng, size):
+    """生成互不相同的随机小写单词"""
+    lengths = rng.integers(4, 12, size=size * 2)
+    letters = rng.integers(ord('a'), ord('z') + 1, size=(size * 2, 12), dtype=np.uint8)
+    words = dict.fromkeys(row[:n].tobytes().decode() for row, n in zip(letters, lengths))
+    return list(words)[:size]
+
+
+def make_tables(rng, words):
+    """frequency 表和 TF-IDF 表：各自约90%的单词，顺序打乱"""
+    size = len(words)
+    freq_words = [words[i] for i in rng.permutation(size)[:size * 9 // 10]]
+    tfidf_words = [words[i] for i in rng.permutation(size)[:size * 9 // 10]]
+    freq_df = pd.DataFrame({'word': pd.Series(freq_words, dtype=object),
+                            'frequency': rng.integers(1, 1000, len(freq_words)).astype('int32')})
+    tfidf_df = pd.DataFrame({'word': pd.Series(tfidf_words, dtype=object),
+                             'score': rng.random(len(tfidf_words)).astype('float32')})
+    return freq_df, tfidf_df
+
+
+def id_join(vocabulary, freq_df, tfidf_df):
+    """与 build_combined_table 相同的按词号连接"""
+    freq_ids = vocabulary.encode_column(freq_df['word'])
+    tfidf_ids = vocabulary.encode_column(tfidf_df['word'])
+    scores = np.zeros(len(vocabulary), dtype=np.float32)
+    has_score = np.zeros(len(vocabulary), dtype=bool)
+    scores[tfidf_ids] = tfidf_df['score'].to_numpy()
+    has_score[tfidf_ids] = True
+    matched = has_score[freq_ids]
+    merged = freq_df[matched].reset_index(drop=True)
+    merged['score'] = scores[freq_ids[matched]]
+    merged['combined_score'] = merged['frequency'].values * merged['score'].values
+    return merged
+
+
+def best_of(func, repeat):
+    """多次运行取最短耗时"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def memory_mb(tables):
+    """表的总内存"""
+    return sum(df.memory_usage(deep=True, index=False).sum() for df in tables) / 1024 ** 2
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100_000, 1_000_000])
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    print(f"{'terms':>10}  {'str MB':>8}  {'ids MB':>8}  {'merge (s)':>9}  {'id join (s)':>11}")
+    for size in args.sizes:
+        rng = np.random.default_rng(args.seed)
+        words = make_words(rng, size)
+        tables = [make_tables(rng, words) for _ in range(2)]
+        string_tables = [df for pair in tables for df in pair]
+
+        vocabulary = Vocabulary()
+        ids = [vocabulary.encode_column(df['word']) for df in string_tables]
+        # 词表不再增长后再生成分类列，四个表共享同一份类别（共享的类别只计算一次）
+        interned = [df.assign(word=vocabulary.categorical(word_ids)) for df, word_ids in zip(string_tables, ids)]
+        interned_mb = (memory_mb([df.assign(word=df['word'].cat.codes) for df in interned])
+                       + memory_mb([pd.DataFrame({'word': vocabulary.dtype().categories})]))
+
+        freq_df, tfidf_df = tables[0]
+        merge_s = best_of(lambda: pd.merge(freq_df, tfidf_df, on='word'), args.repeat)
+        id_s = best_of(lambda: id_join(vocabulary, interned[0], interned[1]), args.repeat)
+        print(f"{size:>10}  {memory_mb(string_tables):>8.1f}  {interned_mb:>8.1f}  {merge_s:>9.3f}  {id_s:>11.3f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+"""词云并行预渲染基准：不同进程数下渲染全部词云变体的耗时
+
+用法:
+    python benchmarks/bench_wordcloud_workers.py --workers 1 2 4 8 --vocab 5000
+
+第一次运行包含进程池启动（spawn + 导入matplotlib/wordcloud）的时间，第二次运行是常驻进程池的耗时。
+"""
+import argparse
+import os
+import random
+import string
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from render import render_wordclouds
+
+
+def make_jobs(variants, vocab_size, seed=0):
+    """用固定随机种子生成词云渲染任务（Zipf分布的词频）"""
+    rng = random.Random(seed)
+    vocabulary = list({
+        ''.join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(3, 12)))
+        for _ in range(vocab_size)
+    })
+    jobs = []
+    for i in range(variants):
+        rng.shuffle(vocabulary)
+        weights = {word: 1.0 / (rank + 1) for rank, word in enumerate(vocabulary)}
+        jobs.append((weights, f"Variant {i + 1}", (8, 4), 100))
+    return jobs
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, os.cpu_count() or 1])
+    parser.add_argument('--variants', type=int, default=6, help="词云数量（默认：2种数据类型 × 3种权重方法）")
+    parser.add_argument('--vocab', type=int, default=5000, help="每个词云的词汇量")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    jobs = make_jobs(args.variants, args.vocab, args.seed)
+    print(f"cpu_count={os.cpu_count()} variants={len(jobs)} vocab={args.vocab}")
+    print(f"{'workers':>7}  {'cold (s)':>9}  {'warm (s)':>9}  {'speedup':>7}")
+
+    baseline = None
+    for workers in sorted(set(args.workers)):
+        start = time.perf_counter()
+        render_wordclouds(jobs, workers)
+        cold = time.perf_counter() - start
+
+        start = time.perf_counter()
+        render_wordclouds(jobs, workers)
+        warm = time.perf_counter() - start
+
+        baseline = baseline or warm
+        print(f"{workers:>7}  {cold:>9.2f}  {warm:>9.2f}  {baseline / warm:>6.2f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+"""批量导出（不启动Streamlit界面）：渲染所有数据类型×权重方法的词云，并把top词汇和平台表写成CSV/JSON
+
+用法:
+    python -m export --output dist --formats png svg --tables csv json
+
+数据文件从 --data-dir 读取（与页面相同，同时会更新那里的快照），词云由进程池并行渲染。
+适合由cron定时运行，为静态镜像预先生成文件，页面服务器不需要做这些计算。
+"""
+import argparse
+import json
+import os
+import time
+
+from pipeline import DATA_TYPES, WEIGHT_METHODS, get_articles_by_platform_and_words, get_wordcloud_spec, update_data_cache
+from render import WORDCLOUD_WORKERS, export_wordclouds
+from topk import top_k_rows
+
+def get_export_name(data_type, weight_method):
+    """词云文件名（不含扩展名），如 wordcloud_content_tfidf"""
+    prefix = 'content' if data_type == "Content Analysis" else 'title'
+    return f"wordcloud_{prefix}_{weight_method.lower().replace('-', '')}"
+
+def write_file(path, content):
+    """原子写入文件（先写临时文件再替换），镜像读取方不会读到写了一半的文件"""
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(content)
+    os.replace(tmp_path, path)
+    return path
+
+def write_table(df, output, name, formats):
+    """把表写成CSV和/或JSON（records格式），返回写入的路径"""
+    paths = []
+    if 'csv' in formats:
+        paths.append(write_file(os.path.join(output, f"{name}.csv"), df.to_csv(index=False).encode()))
+    if 'json' in formats:
+        content = df.to_json(orient='records', force_ascii=False, date_format='iso')
+        paths.append(write_file(os.path.join(output, f"{name}.json"), content.encode()))
+    return paths
+
+def export_wordcloud_files(data, output, formats, max_words=100, max_workers=WORDCLOUD_WORKERS):
+    """用进程池渲染所有数据类型×权重方法的词云并写入文件，返回写入的路径"""
+    names, jobs = [], []
+    for data_type in DATA_TYPES:
+        for weight_method in WEIGHT_METHODS:
+            spec = get_wordcloud_spec(data, data_type, weight_method)
+            if spec['df'] is None or len(spec['df']) == 0:
+                print(f"⚠️ No data for {data_type} / {weight_method}, skipped")
+                continue
+            df = top_k_rows(spec['df'], spec['weight_col'], max_words)
+            jobs.append((dict(zip(df['word'], df[spec['weight_col']])), spec['title'], spec['figsize'], max_words))
+            names.append(get_export_name(data_type, weight_method))
+
+    paths = []
+    for name, outputs in zip(names, export_wordclouds(jobs, formats, max_workers)):
+        for file_format, content in outputs.items():
+            paths.append(write_file(os.path.join(output, f"{name}.{file_format}"), content))
+    return paths
+
+def export_tables(data, output, formats, max_platforms=15):
+    """写入每个词表的top词汇、平台文章数和每日文章数，以及top平台下匹配top词汇的文章"""
+    paths = []
+    for key, top_words in data['top_words'].items():
+        paths += write_table(top_words, output, f"top_words_{key}", formats)
+
+    if data['top_platforms'] is not None:
+        paths += write_table(data['top_platforms'], output, "platforms", formats)
+        paths += write_table(data['daily_counts'].rename_axis('date').reset_index(name='count'), output,
+                             "articles_per_day", formats)
+        articles = {key: get_articles_by_platform_and_words(data['top_platforms'], top_words, data['platform_data'],
+                                                            max_platforms, data['article_index'])
+                    for key, top_words in data['top_words'].items()}
+        if 'json' in formats:
+            content = json.dumps(articles, ensure_ascii=False, indent=2, default=str)
+            paths.append(write_file(os.path.join(output, "articles.json"), content.encode()))
+    return paths
+
+def main():
+    parser = argparse.ArgumentParser(prog='python -m export', description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--output', default='export', help="输出目录")
+    parser.add_argument('--data-dir', default='.', help="数据文件（CSV和快照）所在目录")
+    parser.add_argument('--formats', nargs='+', choices=['png', 'svg'], default=['png', 'svg'], help="词云格式")
+    parser.add_argument('--tables', nargs='+', choices=['csv', 'json'], default=['csv', 'json'], help="表格格式")
+    parser.add_argument('--max-words', type=int, default=100)
+    parser.add_argument('--max-platforms', type=int, default=15, help="articles.json 中的平台数")
+    parser.add_argument('--workers', type=int, default=WORDCLOUD_WORKERS, help="渲染进程数")
+    args = parser.parse_args()
+
+    output = os.path.abspath(args.output)
+    os.makedirs(output, exist_ok=True)
+    # 数据文件路径相对于工作目录（与页面相同）
+    os.chdir(args.data_dir)
+
+    start = time.perf_counter()
+    data = update_data_cache()
+    paths = export_wordcloud_files(data, output, args.formats, args.max_words, args.workers)
+    paths += export_tables(data, output, args.tables, args.max_platforms)
+    manifest = {'last_update': data['last_update'].isoformat(), 'files': sorted(os.path.basename(p) for p in paths)}
+    write_file(os.path.join(output, "manifest.json"), json.dumps(manifest, indent=2).encode())
+    print(f"✅ Exported {len(paths)} files to {output} in {time.perf_counter() - start:.1f}s")
+
+if __name__ == '__main__':
+    main()
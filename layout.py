@@ -0,0 +1,123 @@
+"""可复用的词云布局引擎：保留上一次的词位置，数据小幅变化时只重新放置新增或字号改变的词"""
+import math
+from operator import itemgetter
+from random import Random
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+from wordcloud import WordCloud
+from wordcloud.wordcloud import IntegralOccupancyMap
+
+# 字号分档：名义字号与上次落在同一档（相差约15%以内）的词保留原位置
+SIZE_BUCKET_RATIO = 1.15
+
+def get_size_bucket(font_size):
+    """名义字号所在的档位"""
+    return math.floor(math.log(max(font_size, 1), SIZE_BUCKET_RATIO))
+
+def get_nominal_sizes(frequencies, max_font_size, relative_scaling):
+    """按WordCloud的相对缩放规则计算每个词的名义字号（不考虑放不下时的缩小）"""
+    sizes = {}
+    font_size, last_freq = float(max_font_size), 1.0
+    for word, freq in frequencies:
+        if relative_scaling != 0:
+            font_size *= relative_scaling * (freq / last_freq) + (1 - relative_scaling)
+        sizes[word] = int(round(font_size))
+        last_freq = freq
+    return sizes
+
+def get_draw_font(wordcloud, font_size, orientation):
+    """布局和绘制使用的字体（可能旋转90度）"""
+    return ImageFont.TransposedFont(ImageFont.truetype(wordcloud.font_path, font_size), orientation=orientation)
+
+def make_layout_state(wordcloud, params, max_font_size, nominal_sizes):
+    """从WordCloud的 layout_ 生成布局状态，下一次布局时作为 previous 传入"""
+    return {
+        'params': params,
+        'max_font_size': max_font_size,
+        'words': {
+            word: {'nominal': nominal_sizes[word], 'font_size': font_size, 'position': tuple(map(int, position)),
+                   'orientation': orientation, 'color': color}
+            for (word, _), font_size, position, orientation, color in wordcloud.layout_
+        }
+    }
+
+def layout_wordcloud(word_weights, max_words, previous=None, **params):
+    """布局词云，返回 (带 layout_ 的WordCloud对象, 布局状态)
+
+    没有 previous（或参数改变）时完整运行WordCloud布局；否则名义字号档位没变的词
+    保留上次的位置、方向和颜色，先画入占用图，只为新增或字号变化的词寻找位置。
+    """
+    wordcloud = WordCloud(max_words=max_words, **params)
+    frequencies = sorted(word_weights.items(), key=itemgetter(1), reverse=True)[:max_words]
+    if not frequencies:
+        raise ValueError("We need at least 1 word to plot a word cloud, got 0.")
+    max_frequency = float(frequencies[0][1])
+    frequencies = [(word, freq / max_frequency) for word, freq in frequencies]
+    params_key = repr(sorted(params.items()))
+
+    if previous is None or previous['params'] != params_key:
+        wordcloud.generate_from_frequencies(dict(frequencies))
+        max_font_size = wordcloud.layout_[0][1] if wordcloud.layout_ else wordcloud.height
+        nominal_sizes = get_nominal_sizes(frequencies, max_font_size, wordcloud.relative_scaling)
+        return wordcloud, make_layout_state(wordcloud, params_key, max_font_size, nominal_sizes)
+
+    max_font_size = previous['max_font_size']
+    nominal_sizes = get_nominal_sizes(frequencies, max_font_size, wordcloud.relative_scaling)
+    width, height = wordcloud.width, wordcloud.height
+    img_grey = Image.new("L", (width, height))
+    draw = ImageDraw.Draw(img_grey)
+
+    # 保留字号档位没变的词
+    kept = {}
+    for word, _ in frequencies:
+        slot = previous['words'].get(word)
+        if slot is not None and get_size_bucket(slot['nominal']) == get_size_bucket(nominal_sizes[word]):
+            x, y = slot['position']
+            draw.text((y, x), word, fill="white", font=get_draw_font(wordcloud, slot['font_size'], slot['orientation']))
+            kept[word] = slot
+    occupancy = IntegralOccupancyMap(height, width, None)
+    occupancy.update(np.asarray(img_grey), 0, 0)
+
+    # 按权重从大到小放置其余的词（与WordCloud相同的取样和缩小规则）
+    random_state = Random()
+    layout = []
+    canvas_full = False
+    for word, freq in frequencies:
+        slot = kept.get(word)
+        if slot is not None:
+            layout.append(((word, freq), slot['font_size'], slot['position'], slot['orientation'], slot['color']))
+            continue
+        if canvas_full:
+            continue
+        font_size = nominal_sizes[word]
+        orientation = None if random_state.random() < wordcloud.prefer_horizontal else Image.ROTATE_90
+        tried_other_orientation = False
+        result = None
+        while font_size >= wordcloud.min_font_size:
+            font = get_draw_font(wordcloud, font_size, orientation)
+            box_size = draw.textbbox((0, 0), word, font=font, anchor="lt")
+            result = occupancy.sample_position(box_size[3] + wordcloud.margin, box_size[2] + wordcloud.margin,
+                                               random_state)
+            if result is not None:
+                break
+            if not tried_other_orientation and wordcloud.prefer_horizontal < 1:
+                orientation = Image.ROTATE_90
+                tried_other_orientation = True
+            else:
+                font_size -= wordcloud.font_step
+                orientation = None
+        if result is None:
+            # 与WordCloud一样，最小字号也放不下时不再放置新的词（保留的词照常输出）
+            canvas_full = True
+            continue
+        x, y = np.array(result) + wordcloud.margin // 2
+        draw.text((y, x), word, fill="white", font=font)
+        occupancy.update(np.asarray(img_grey), x, y)
+        color = wordcloud.color_func(word, font_size=font_size, position=(x, y), orientation=orientation,
+                                     random_state=random_state, font_path=wordcloud.font_path)
+        layout.append(((word, freq), font_size, (int(x), int(y)), orientation, color))
+
+    wordcloud.words_ = dict(frequencies)
+    wordcloud.layout_ = layout
+    return wordcloud, make_layout_state(wordcloud, params_key, max_font_size, nominal_sizes)
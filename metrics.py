@@ -0,0 +1,124 @@
+"""轻量级性能埋点：记录各阶段的耗时、行数和内存占用，并导出为Prometheus文本格式"""
+from collections import deque
+import contextlib
+import math
+import os
+import threading
+import time
+
+# 环形缓冲区大小（只保留最近的记录）
+METRICS_BUFFER_SIZE = int(os.environ.get('DASHBOARD_METRICS_BUFFER_SIZE', 4096))
+
+# 设置后定期把指标写入该文件（例如node_exporter的textfile目录）
+METRICS_FILE = os.environ.get('DASHBOARD_METRICS_FILE')
+METRICS_EXPORT_INTERVAL = float(os.environ.get('DASHBOARD_METRICS_EXPORT_INTERVAL', 15))
+
+_records = deque(maxlen=METRICS_BUFFER_SIZE)
+# 进程启动以来每个阶段的累计次数和耗时（Prometheus summary 的 _count/_sum）
+_totals = {}
+_lock = threading.Lock()
+_last_export = 0.0
+
+def record(stage, seconds, rows=None, memory_bytes=None):
+    """记录一次阶段耗时"""
+    global _last_export
+    with _lock:
+        _records.append({'stage': stage, 'seconds': seconds, 'rows': rows,
+                         'memory_bytes': memory_bytes, 'time': time.time()})
+        count, total = _totals.get(stage, (0, 0.0))
+        _totals[stage] = (count + 1, total + seconds)
+        should_export = METRICS_FILE and time.monotonic() - _last_export >= METRICS_EXPORT_INTERVAL
+        if should_export:
+            _last_export = time.monotonic()
+    if should_export:
+        export_prometheus(METRICS_FILE)
+
+@contextlib.contextmanager
+def timed(stage):
+    """计时上下文；在 with 块中设置 info['rows'] / info['memory_bytes'] 记录行数和内存"""
+    info = {'rows': None, 'memory_bytes': None}
+    start = time.perf_counter()
+    try:
+        yield info
+    finally:
+        record(stage, time.perf_counter() - start, info['rows'], info['memory_bytes'])
+
+def frame_memory(df, is_shared=None):
+    """DataFrame占用的内存字节数；is_shared(dtype) 为真的分类列只计算编码（类别由多个表共用，不属于单个表）"""
+    if is_shared is None:
+        return int(df.memory_usage(deep=True).sum())
+    total = df.index.memory_usage(deep=True)
+    for _, column in df.items():
+        total += column.cat.codes.nbytes if is_shared(column.dtype) else column.memory_usage(deep=True, index=False)
+    return int(total)
+
+def get_records():
+    """返回当前缓冲区中的记录副本"""
+    with _lock:
+        return list(_records)
+
+def quantile(values, q):
+    """最近秩法分位数"""
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(q * len(ordered)) - 1)]
+
+def summarize():
+    """按阶段汇总：缓冲区内的p50/p95耗时、累计次数和耗时、最近一次的行数和内存"""
+    stages = {}
+    for item in get_records():
+        stages.setdefault(item['stage'], []).append(item)
+    with _lock:
+        totals = dict(_totals)
+    summary = []
+    for stage, items in stages.items():
+        seconds = [item['seconds'] for item in items]
+        count, total = totals.get(stage, (len(items), sum(seconds)))
+        summary.append({
+            'stage': stage,
+            'count': count,
+            'total_s': total,
+            'p50_ms': quantile(seconds, 0.5) * 1000,
+            'p95_ms': quantile(seconds, 0.95) * 1000,
+            'rows': next((item['rows'] for item in reversed(items) if item['rows'] is not None), None),
+            'memory_bytes': next((item['memory_bytes'] for item in reversed(items)
+                                  if item['memory_bytes'] is not None), None)
+        })
+    return summary
+
+def to_prometheus():
+    """导出为Prometheus文本格式"""
+    lines = [
+        '# HELP dashboard_stage_duration_seconds Duration of dashboard pipeline stages.',
+        '# TYPE dashboard_stage_duration_seconds summary'
+    ]
+    summary = summarize()
+    for item in summary:
+        label = f'stage="{item["stage"]}"'
+        lines.append(f'dashboard_stage_duration_seconds{{{label},quantile="0.5"}} {item["p50_ms"] / 1000:.6f}')
+        lines.append(f'dashboard_stage_duration_seconds{{{label},quantile="0.95"}} {item["p95_ms"] / 1000:.6f}')
+        lines.append(f'dashboard_stage_duration_seconds_sum{{{label}}} {item["total_s"]:.6f}')
+        lines.append(f'dashboard_stage_duration_seconds_count{{{label}}} {item["count"]}')
+    
+    lines += [
+        '# HELP dashboard_stage_rows Rows processed by the last run of each stage.',
+        '# TYPE dashboard_stage_rows gauge'
+    ]
+    lines += [f'dashboard_stage_rows{{stage="{item["stage"]}"}} {item["rows"]}'
+              for item in summary if item['rows'] is not None]
+    lines += [
+        '# HELP dashboard_stage_memory_bytes DataFrame memory produced by the last run of each stage.',
+        '# TYPE dashboard_stage_memory_bytes gauge'
+    ]
+    lines += [f'dashboard_stage_memory_bytes{{stage="{item["stage"]}"}} {item["memory_bytes"]}'
+              for item in summary if item['memory_bytes'] is not None]
+    return '\n'.join(lines) + '\n'
+
+def export_prometheus(path):
+    """原子写入Prometheus文本文件"""
+    try:
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            f.write(to_prometheus())
+        os.replace(tmp_path, path)
+    except OSError as e:
+        print(f"❌ Failed to export metrics to {path}: {e}")
@@ -0,0 +1,1154 @@
+"""数据管道（不依赖Streamlit）：加载和清理数据文件、快照与增量读取、聚合、词表和词云渲染
+
+页面（app.py）和批量导出（export.py）共用这些函数；出错时抛出异常或打印日志，由调用方决定如何显示。
+"""
+from collections import OrderedDict
+from datetime import datetime, timedelta
+import functools
+import hashlib
+import io
+import json
+import os
+import pickle
+import re
+import sys
+import threading
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+
+import metrics
+from analytics import ANALYTICS_WORKERS, TermMatrix, tfidf_scores, word_counts
+from render import WORDCLOUD_PARAMS, WORDCLOUD_WORKERS, render_wordcloud, render_wordclouds
+from topk import top_k_rows
+from vocab import VOCABULARY
+
+# 数据文件映射
+DATA_FILES = {
+    'word_freq': 'word_frequency.csv',
+    'word_freq_title': 'word_frequency_title.csv',
+    'tfidf': 'tfidf.csv',
+    'tfidf_title': 'tfidf_title.csv',
+    'articles': 'articles.csv'
+}
+WORD_DATA_KEYS = ['word_freq', 'word_freq_title', 'tfidf', 'tfidf_title']
+
+# 列式二进制快照目录（已清理、已固定列类型的Feather文件）
+SNAPSHOT_DIR = os.environ.get('DASHBOARD_SNAPSHOT_DIR', '.snapshot')
+
+# articles.csv 只读取页面用到的列（不读取正文content），并按块流式读取
+ARTICLE_COLUMNS = ['id', 'platform', 'published_time', 'title', 'url']
+ARTICLE_CHUNK_ROWS = int(os.environ.get('DASHBOARD_ARTICLE_CHUNK_ROWS', 100_000))
+
+# 增量读取时用来确认文件只被追加的字节数
+APPEND_ANCHOR_BYTES = 256
+
+# 服务端共享缓存：后台定时刷新间隔（所有会话共用一个TTL）与内存上限
+CACHE_TTL = timedelta(hours=3)
+# 还没有任何快照时（首次加载失败），按此间隔重试，每次失败后翻倍，最长为CACHE_TTL
+REFRESH_RETRY_DELAY = timedelta(seconds=int(os.environ.get('DASHBOARD_REFRESH_RETRY_SECONDS', 30)))
+CACHE_MAX_BYTES = int(os.environ.get('DASHBOARD_CACHE_MAX_BYTES', 2 * 1024 ** 3))
+
+# 词云图片缓存（PNG）的数量与内存上限
+IMAGE_CACHE_MAX_ITEMS = int(os.environ.get('DASHBOARD_IMAGE_CACHE_MAX_ITEMS', 64))
+IMAGE_CACHE_MAX_BYTES = int(os.environ.get('DASHBOARD_IMAGE_CACHE_MAX_BYTES', 128 * 1024 ** 2))
+
+# 即时计算的词表缓存数量（按平台和时间窗口筛选的结果）
+LIVE_CACHE_MAX_ITEMS = int(os.environ.get('DASHBOARD_LIVE_CACHE_MAX_ITEMS', 16))
+
+# 页面上的数据类型和权重方法选项
+DATA_TYPES = ["Content Analysis", "Title Analysis"]
+WEIGHT_METHODS = ["Frequency", "TF-IDF", "Combined"]
+
+# 时间窗口选项（以最新文章所在小时为终点）；Custom 按日期范围选择
+TIME_WINDOWS = {
+    "All time": None,
+    "Last hour": timedelta(hours=1),
+    "Last 24 hours": timedelta(hours=24),
+    "Last 7 days": timedelta(days=7),
+    "Custom": None
+}
+
+def get_english_stopwords():
+    """获取英文停用词列表"""
+    english_stopwords = {
+        # 基础冠词、连词、介词
+        'a', 'an', 'the', 'and', 'or', 'but', 'if', 'because', 'as', 'until', 'while', 
+        'of', 'at', 'by', 'for', 'with', 'about', 'against', 'between', 'into', 'through', 
+        'during', 'before', 'after', 'above', 'below', 'to', 'from', 'up', 'down', 'in', 
+        'out', 'on', 'off', 'over', 'under', 'again', 'further', 'then', 'once', 'here', 
+        'there', 'when', 'where', 'why', 'how', 'all', 'any', 'both', 'each', 'few', 
+        'more', 'most', 'other', 'some', 'such', 'no', 'nor', 'not', 'only', 'own', 
+        'same', 'so', 'than', 'too', 'very', 'can', 'will', 'just', "don't", "should", 
+        "now", "'s", "'t", "'m", "'re", "'ve", "'d", "'ll", "n't", 'be', 'is', 'are', 
+        'was', 'were', 'been', 'being', 'have', 'has', 'had', 'having', 'do', 'does', 
+        'did', 'doing', 
+        
+        # 新增连词
+        'also', 'although', 'though', 'since', 'unless', 'whether', 'while', 'whereas',
+        'therefore', 'thus', 'hence', 'consequently', 'moreover', 'furthermore', 
+        'however', 'nevertheless', 'nonetheless', 'otherwise', 'instead', 'meanwhile',
+        
+        # 时间相关词汇
+        'year', 'years', 'month', 'months', 'week', 'weeks', 'day', 'days', 'hour', 
+        'hours', 'minute', 'minutes', 'second', 'seconds', 'time', 'times', 'season',
+        'seasons', 'today', 'tomorrow',
+        'yesterday', 'now', 'then', 'when', 'before', 'after', 'during', 'while',
+        'moment', 'period', 'date', 'calendar', 'clock', 'schedule',
+        
+        # 数字和序数词
+        'one', 'two', 'three', 'four', 'five', 'six', 'seven', 'eight', 'nine', 'ten',
+        'first', 'second', 'third', 'fourth', 'fifth', 'sixth', 'seventh', 'eighth',
+        'ninth', 'tenth', 'once', 'twice', 'thrice', 'single', 'double', 'triple',
+        'number', 'numbers', 'count', 'total', 'amount', 'quantity',
+        
+        # 常见代词和人称
+        'i', 'you', 'he', 'she', 'it', 'we', 'they', 'me', 'him', 'her', 'us', 'them',
+        'my', 'your', 'his', 'its', 'our', 'their', 'mine', 'yours', 'hers', 'ours',
+        'theirs', 'myself', 'yourself', 'himself', 'herself', 'itself', 'ourselves',
+        'yourselves', 'themselves',
+        
+        # 常见助动词和情态动词
+        'may', 'might', 'must', 'shall', 'should', 'would', 'could', 'ought','said'
+        
+        # 标点符号和特殊字符
+        '', ' ', '  ', ',', '.', '!', '?', ':', ';', '-', '(', ')', 
+        '[', ']', '{', '}', '/', '\\', '|', '@', '#', '$', '%', '^', '&', '*', '+', '=', 
+        '<', '>', '~', '_', '"', "'", '`',
+        
+        # 常见无意义词汇
+        'very', 'really', 'quite', 'rather', 'pretty', 'just', 'even', 'still', 'yet',
+        'already', 'almost', 'nearly', 'hardly', 'scarcely', 'simply', 'merely',
+        'actually', 'basically', 'essentially', 'literally', 'virtually'
+    }
+    
+    # 添加单个字母
+    english_stopwords.update([chr(i) for i in range(97, 123)])
+    english_stopwords.update([chr(i) for i in range(65, 91)])
+    
+    # 添加数字
+    english_stopwords.update([str(i) for i in range(0, 100)])
+    
+    return english_stopwords
+
+# 停用词集合只在模块加载时构建一次
+ENGLISH_STOPWORDS = frozenset(get_english_stopwords())
+
+def is_english_word(word):
+    """检查单词是否只包含英文字母"""
+    if not isinstance(word, str):
+        return False
+    # 使用正则表达式检查是否只包含英文字母（允许连字符和撇号）
+    return bool(re.match(r'^[a-zA-Z\-\.\']+$', word))
+
+def get_valid_word_mask(words):
+    """整列判断单词是否有效（向量化），结果与逐行检查一致"""
+    try:
+        str_words = words.str
+    except AttributeError:
+        # 整列都不是字符串
+        return pd.Series(False, index=words.index)
+    
+    # 只包含英文字母（允许连字符和撇号），等价于 re.match(r'^[a-zA-Z\-\.\']+$')
+    is_english = str_words.fullmatch(r"[a-zA-Z\-\.']+\n?").fillna(False).astype(bool)
+    word_clean = str_words.strip().str.lower()
+    
+    return (
+        is_english
+        # 检查是否是停用词
+        & ~word_clean.isin(ENGLISH_STOPWORDS)
+        # 检查单词长度
+        & (word_clean.str.len() > 1).fillna(False).astype(bool)
+        # 检查是否全是特殊字符
+        & ~word_clean.str.fullmatch(r'[^\w\s]+').fillna(False).astype(bool)
+    )
+
+def get_valid_word_ids():
+    """全局词表上预先计算的有效词掩码（按词号索引，新词加入时增量计算）"""
+    return VOCABULARY.mask('valid', get_valid_word_mask)
+
+def intern_words(df, word_col='word'):
+    """把单词列换成共享全局词表的分类列（每行只保存词号），返回 (新DataFrame, 词号数组)"""
+    word_ids = VOCABULARY.encode_column(df[word_col])
+    df = df.assign(**{word_col: VOCABULARY.categorical(word_ids)})
+    return df, word_ids
+
+def release_words(df):
+    """离开管道的表（页面表格、会话状态、导出文件）：共享全局词表的分类列换成普通字符串，不再携带整个词表"""
+    return df.assign(**{column: df[column].astype(str) for column in df.columns
+                        if VOCABULARY.is_shared(df[column].dtype)})
+
+def frame_memory(df):
+    """缓存和指标使用的内存字节数：共享的全局词表只属于词表本身，不计入每个表"""
+    return metrics.frame_memory(df, VOCABULARY.is_shared)
+
+def clean_with_stopwords(df, word_col='word'):
+    """使用停用词列表清理数据，单词列同时换成全局词表的词号"""
+    original_count = len(df)
+    with metrics.timed('stopword_cleaning') as info:
+        df, word_ids = intern_words(df, word_col)
+        cleaned_df = df[VOCABULARY.lookup(word_ids, get_valid_word_ids())].copy()
+        info['rows'] = original_count
+    return cleaned_df, original_count - len(cleaned_df)
+
+@functools.cache
+def get_image_cache():
+    """获取进程级词云图片缓存（LRU，保存渲染好的PNG字节）和每个词云最近一次的布局状态"""
+    return {'lock': threading.Lock(), 'images': OrderedDict(), 'bytes': 0, 'layouts': {}}
+
+def get_wordcloud_key(df, columns, **params):
+    """根据词频数据内容和WordCloud参数计算缓存键"""
+    digest = hashlib.blake2b(digest_size=16)
+    for column in columns:
+        # 分类列按单词本身计算（不对整个共享词表求哈希）
+        digest.update(pd.util.hash_array(np.asarray(df[column])).tobytes())
+    digest.update(repr(sorted({**WORDCLOUD_PARAMS, **params}.items())).encode())
+    return digest.hexdigest()
+
+def get_cached_png(key, image_cache=None):
+    """从图片缓存读取PNG字节，未命中返回 None"""
+    cache = image_cache if image_cache is not None else get_image_cache()
+    with cache['lock']:
+        png = cache['images'].get(key)
+        if png is not None:
+            cache['images'].move_to_end(key)
+        return png
+
+def put_cached_png(key, png, image_cache=None):
+    """写入图片缓存，并按数量和字节数淘汰最久未使用的图片"""
+    cache = image_cache if image_cache is not None else get_image_cache()
+    with cache['lock']:
+        if key not in cache['images']:
+            cache['images'][key] = png
+            cache['bytes'] += len(png)
+        while len(cache['images']) > 1 and (
+                len(cache['images']) > IMAGE_CACHE_MAX_ITEMS or cache['bytes'] > IMAGE_CACHE_MAX_BYTES):
+            _, evicted = cache['images'].popitem(last=False)
+            cache['bytes'] -= len(evicted)
+
+def get_cached_image(key, render):
+    """命中缓存时直接返回PNG字节，否则调用 render() 渲染并写入缓存"""
+    png = get_cached_png(key)
+    if png is None:
+        png = render()
+        put_cached_png(key, png)
+    return png
+
+def get_layout(layout_key, image_cache=None):
+    """读取词云最近一次的布局状态（新布局从它热启动，保持词的位置），没有时返回 None"""
+    if layout_key is None:
+        return None
+    cache = image_cache if image_cache is not None else get_image_cache()
+    with cache['lock']:
+        return cache['layouts'].get(layout_key)
+
+def put_layout(layout_key, layout, image_cache=None):
+    """保存词云的布局状态（每个词云只保留最近一次）"""
+    if layout_key is None:
+        return
+    cache = image_cache if image_cache is not None else get_image_cache()
+    with cache['lock']:
+        cache['layouts'][layout_key] = layout
+
+def get_wordcloud_job(df, word_col, weight_col, title, max_words, figsize, layout_key=None, image_cache=None):
+    """返回 (缓存键, 生成 render_wordcloud 参数的函数)"""
+    # WordCloud只会画出权重最大的 max_words 个词，只用这些词计算缓存键和构建词典
+    df = top_k_rows(df, weight_col, max_words)
+    key = get_wordcloud_key(df, [word_col, weight_col], title=title, figsize=figsize, max_words=max_words)
+    return key, lambda: (dict(zip(df[word_col], df[weight_col])), title, figsize, max_words,
+                         get_layout(layout_key, image_cache))
+
+def generate_wordcloud(df, word_col='word', weight_col='frequency', title="Word Cloud", max_words=100, figsize=(8, 4),
+                       layout_key=None):
+    """生成词云图，返回PNG字节；layout_key 相同的词云从上一次的布局热启动"""
+    if df is None or len(df) == 0:
+        return None
+    key, job = get_wordcloud_job(df, word_col, weight_col, title, max_words, figsize, layout_key)
+    
+    def render():
+        png, layout = render_wordcloud(*job())
+        put_layout(layout_key, layout)
+        return png
+    
+    return get_cached_image(key, render)
+
+def get_wordcloud_spec(data, data_type, weight_method):
+    """返回词云的数据和渲染参数（页面渲染和后台预渲染共用，保证缓存键一致）"""
+    prefix = 'content' if data_type == "Content Analysis" else 'title'
+    # 同一个数据类型×权重方法的词云在每次刷新之间保持布局
+    layout_key = f"{prefix}_{weight_method}"
+    if weight_method == "Combined":
+        return {'df': data['word_data'][f'{prefix}_combined'], 'weight_col': 'combined_score',
+                'title': f"Combined Word Cloud ({data_type})", 'figsize': (10, 5), 'layout_key': layout_key}
+    if weight_method == "Frequency":
+        return {'df': data['word_data'][f'{prefix}_freq'], 'weight_col': 'frequency',
+                'title': "Word Cloud", 'figsize': (8, 4), 'layout_key': layout_key}
+    return {'df': data['word_data'][f'{prefix}_tfidf'], 'weight_col': 'score',
+            'title': "Word Cloud", 'figsize': (8, 4), 'layout_key': layout_key}
+
+def prerender_wordclouds(data, image_cache=None, max_workers=WORDCLOUD_WORKERS, max_words=100):
+    """用进程池并行预渲染所有数据类型×权重方法的词云并写入图片缓存，返回新渲染的数量"""
+    jobs = {}
+    for data_type in DATA_TYPES:
+        for weight_method in WEIGHT_METHODS:
+            spec = get_wordcloud_spec(data, data_type, weight_method)
+            if spec['df'] is None or len(spec['df']) == 0:
+                continue
+            key, job = get_wordcloud_job(spec['df'], 'word', spec['weight_col'], spec['title'], max_words,
+                                         spec['figsize'], spec['layout_key'], image_cache)
+            if key not in jobs and get_cached_png(key, image_cache) is None:
+                jobs[key] = (job(), spec['layout_key'])
+    
+    results = render_wordclouds([args for args, _ in jobs.values()], max_workers)
+    for (key, (_, layout_key)), (png, layout) in zip(jobs.items(), results):
+        put_cached_png(key, png, image_cache)
+        put_layout(layout_key, layout, image_cache)
+    return len(jobs)
+
+def build_combined_table(freq_df, tfidf_df, word_col='word', freq_col='frequency', tfidf_col='score'):
+    """合并frequency和TF-IDF表并计算综合分数（不排序，需要top词汇时用 top_k_rows）"""
+    if freq_df is None or tfidf_df is None:
+        return None
+    with metrics.timed('combined_precompute') as info:
+        # 按词号连接：TF-IDF分数放进按词号索引的数组，frequency表的每一行直接按词号取分数
+        freq_ids = VOCABULARY.encode_column(freq_df[word_col])
+        tfidf_ids = VOCABULARY.encode_column(tfidf_df[word_col])
+        scores = np.zeros(len(VOCABULARY), dtype=tfidf_df[tfidf_col].dtype)
+        has_score = np.zeros(len(VOCABULARY), dtype=bool)
+        scored = tfidf_ids >= 0
+        scores[tfidf_ids[scored]] = tfidf_df[tfidf_col].to_numpy()[scored]
+        has_score[tfidf_ids[scored]] = True
+        matched = VOCABULARY.lookup(freq_ids, has_score)
+        merged = freq_df[matched].reset_index(drop=True)
+        merged[tfidf_col] = scores[freq_ids[matched]]
+        # 计算综合分数（frequency * TF-IDF）
+        merged['combined_score'] = merged[freq_col].values * merged[tfidf_col].values
+        info['rows'], info['memory_bytes'] = len(merged), frame_memory(merged)
+    return merged
+
+def generate_combined_wordcloud(df, word_col='word', weight_col='combined_score', title="Combined Word Cloud", max_words=100):
+    """生成结合frequency和TF-IDF的词云（使用预计算的综合分数），返回PNG字节"""
+    return generate_wordcloud(df, word_col=word_col, weight_col=weight_col, title=title,
+                              max_words=max_words, figsize=(10, 5))
+
+
+
+def normalize_data_frame(key, df):
+    """解析时间列并统一列名"""
+    # 尝试解析时间列
+    if key == 'articles' and 'published_time' in df.columns:
+        df['published_time'] = pd.to_datetime(df['published_time'], errors='coerce')
+    
+    # 统一列名
+    if key in ['word_freq', 'word_freq_title'] and 'count' in df.columns:
+        df = df.rename(columns={'count': 'frequency'})
+    return df
+
+def get_csv_columns(key):
+    """read_csv 的 usecols：文章表只读取需要的列，其余数据文件读取全部列"""
+    return (lambda column: column in ARTICLE_COLUMNS) if key == 'articles' else None
+
+def read_article_chunks(filename):
+    """按块读取articles.csv（只读取需要的列），逐块返回解析后的DataFrame"""
+    reader = pd.read_csv(filename, usecols=get_csv_columns('articles'), chunksize=ARTICLE_CHUNK_ROWS)
+    with reader:
+        for chunk in reader:
+            yield normalize_data_frame('articles', chunk)
+
+def concat_article_chunks(chunks):
+    """拼接文章分块，平台列合并为同一个分类类型"""
+    if len(chunks) == 1:
+        return chunks[0]
+    df = pd.concat(chunks, ignore_index=True)
+    if 'platform' in df.columns and all(isinstance(chunk['platform'].dtype, pd.CategoricalDtype) for chunk in chunks):
+        df['platform'] = pd.api.types.union_categoricals([chunk['platform'] for chunk in chunks], ignore_order=True)
+    return df
+
+def load_data_file(key, filename):
+    """加载单个数据文件，文件不存在时返回示例数据"""
+    try:
+        with metrics.timed('csv_load') as info:
+            if key == 'articles':
+                df = concat_article_chunks(list(read_article_chunks(filename)))
+            else:
+                df = normalize_data_frame(key, pd.read_csv(filename))
+            info['rows'], info['memory_bytes'] = len(df), frame_memory(df)
+        print(f"✅ Loaded {filename}")
+        return df
+        
+    except FileNotFoundError:
+        print(f"❌ {filename} not found, using sample data")
+        # 创建示例数据
+        if key == 'articles':
+            return pd.DataFrame({
+                'id': [1, 2, 3], 'country': ['US', 'UK', 'CA'],
+                'platform': ['news.com', 'blog.org', 'forum.net'],
+                'published_time': pd.to_datetime(['2025-11-13 10:00:00', '2025-11-13 11:00:00', '2025-11-13 12:00:00']),
+                'title': ['Sample 1', 'Sample 2', 'Sample 3'],
+                'content': ['Content 1', 'Content 2', 'Content 3'],
+                'url': ['http://example.com/1', 'http://example.com/2', 'http://example.com/3']
+            })
+        return pd.DataFrame({
+            'word': ['technology', 'innovation', 'data', 'analysis', 'research'],
+            'frequency' if key in ['word_freq', 'word_freq_title'] else 'score': [100, 80, 60, 40, 20]
+        })
+
+def load_data_files():
+    """加载所有数据文件"""
+    return {key: load_data_file(key, filename) for key, filename in DATA_FILES.items()}
+
+def sum_word_frequencies(df):
+    """同一单词的多行 (word, frequency) 求和为一行（按首次出现的顺序），完整加载和增量追加的结果一致"""
+    if 'frequency' not in df.columns:
+        return df
+    word_ids = VOCABULARY.encode_column(df['word'])
+    if not pd.Series(word_ids).duplicated().any():
+        return df
+    totals = df['frequency'].reset_index(drop=True).groupby(word_ids, sort=False).sum()
+    return pd.DataFrame({'word': VOCABULARY.categorical(totals.index.to_numpy(np.int32)),
+                         'frequency': totals.to_numpy()})
+
+def prepare_data_file(key, df):
+    """清理词汇数据并固定列类型（CSV和快照两条加载路径结果一致）"""
+    if key in WORD_DATA_KEYS:
+        df, removed_count = clean_with_stopwords(df)
+        print(f"Cleaned {key}: removed {removed_count} stopwords")
+        if key in ['word_freq', 'word_freq_title']:
+            df = sum_word_frequencies(df)
+        if 'frequency' in df.columns and pd.api.types.is_integer_dtype(df['frequency']):
+            df['frequency'] = df['frequency'].astype('int32')
+        if 'score' in df.columns:
+            df['score'] = df['score'].astype('float32')
+    elif key == 'articles':
+        # 正文等页面不用的列不进入缓存和快照
+        df = df[[column for column in df.columns if column in ARTICLE_COLUMNS]].copy()
+        if 'platform' in df.columns:
+            df['platform'] = df['platform'].astype('category')
+    return df.reset_index(drop=True)
+
+def load_articles_file(filename):
+    """流式加载articles.csv，返回 (已清理的DataFrame, 聚合结果)
+    
+    每块读入后立即归约进聚合结果（平台计数、标题关键词索引、每日文章数），
+    正文列不会被读取，解析时的峰值内存只与块大小有关，常驻的只有需要的列。
+    """
+    prepared = []
+    hourly_platforms, hourly_words = [], []
+    aggregates = None
+    start = 0
+    try:
+        with metrics.timed('csv_load') as info:
+            for chunk in read_article_chunks(filename):
+                chunk = prepare_data_file('articles', chunk)
+                # 聚合结果返回前只属于这里，可以原地扩展；小时桶先按块收集，最后一次合并
+                aggregates = update_article_aggregates(aggregates, chunk, start, copy=False, hourly=False)
+                platform_buckets, word_buckets = count_hourly(chunk)
+                hourly_platforms.append(platform_buckets)
+                hourly_words.append(word_buckets)
+                prepared.append(chunk)
+                start += len(chunk)
+            df = concat_article_chunks(prepared)
+            if aggregates is not None:
+                aggregates['hourly_platforms'] = combine_time_buckets(hourly_platforms, 'platform')
+                aggregates['hourly_words'] = combine_time_buckets(hourly_words, 'word')
+            info['rows'], info['memory_bytes'] = len(df), frame_memory(df)
+    except FileNotFoundError:
+        df = prepare_data_file('articles', load_data_file('articles', filename))
+        return df, update_article_aggregates(None, df)
+    print(f"✅ Loaded {filename} ({len(prepared)} chunks)")
+    return df, aggregates
+
+def get_read_position(filename):
+    """记录CSV当前的读取位置：字节偏移量和偏移量之前的一段字节（用于确认文件只被追加）"""
+    try:
+        with open(filename, 'rb') as f:
+            offset = f.seek(0, os.SEEK_END)
+            f.seek(max(0, offset - APPEND_ANCHOR_BYTES))
+            return {'offset': offset, 'anchor': f.read(APPEND_ANCHOR_BYTES)}
+    except OSError:
+        return None
+
+def mark_overlap(filename, position):
+    """完整加载之后文件已经不在加载前记录的位置（加载期间被追加）时给读取位置加上 overlap 标记，
+    下次增量读取可能重复读到加载时已经读过的行"""
+    if position is not None and get_read_position(filename) != position:
+        position = {**position, 'overlap': True}
+    return position
+
+def read_appended_rows(filename, position, usecols=None):
+    """读取CSV在上次读取位置之后追加的完整行，返回 (新增行, 新的读取位置)；文件被改写时返回 None"""
+    try:
+        with open(filename, 'rb') as f:
+            header = f.readline()
+            offset = position['offset']
+            anchor = position['anchor']
+            if offset < len(header) or f.seek(0, os.SEEK_END) < offset:
+                return None
+            f.seek(offset - len(anchor))
+            if f.read(len(anchor)) != anchor:
+                return None
+            new_bytes = f.read()
+    except OSError:
+        return None
+    
+    # 只读取完整的行，写到一半的行留给下次刷新
+    end = new_bytes.rfind(b'\n') + 1
+    new_position = {'offset': offset + end, 'anchor': (anchor + new_bytes[:end])[-APPEND_ANCHOR_BYTES:]}
+    if end == 0:
+        return pd.DataFrame(columns=pd.read_csv(io.BytesIO(header), usecols=usecols).columns), new_position
+    with metrics.timed('csv_append') as info:
+        delta = pd.read_csv(io.BytesIO(header + new_bytes[:end]), usecols=usecols)
+        info['rows'] = len(delta)
+    return delta, new_position
+
+def drop_seen_rows(key, df, delta, position):
+    """完整加载CSV期间文件被追加时（读取位置带 overlap 标记），按id高水位去掉加载时已经读到的文章
+    
+    其他情况下读取位置的锚点已经保证不会重复读取，新增行原样保留（id不一定递增）。
+    """
+    if (position.get('overlap') and key == 'articles' and 'id' in df.columns and 'id' in delta.columns
+            and len(df) > 0):
+        delta = delta[delta['id'] > df['id'].max()]
+    return delta
+
+def merge_appended_rows(key, df, delta):
+    """把追加的新增行合并进已清理的数据，不支持增量的数据返回 None"""
+    if key == 'articles':
+        merged = pd.concat([df, delta], ignore_index=True)
+        if 'platform' in df.columns:
+            # 新增行的类别类型与已有数据一致后才能合并（如空的新增块是 object 类型）
+            platform = delta['platform'].astype('category')
+            categories = platform.cat.categories.astype(df['platform'].cat.categories.dtype)
+            merged['platform'] = pd.api.types.union_categoricals(
+                [df['platform'], platform.cat.rename_categories(categories)], ignore_order=True)
+        return merged
+    if key in ['word_freq', 'word_freq_title']:
+        # 追加的 (word, count) 行视为词频增量，与完整加载相同地按单词求和
+        word_ids = np.concatenate([VOCABULARY.encode_column(df['word']), VOCABULARY.encode_column(delta['word'])])
+        merged = sum_word_frequencies(pd.DataFrame({
+            'word': VOCABULARY.categorical(word_ids),
+            'frequency': np.concatenate([df['frequency'].to_numpy(np.int64), delta['frequency'].to_numpy(np.int64)])
+        }))
+        merged['frequency'] = merged['frequency'].astype('int32')
+        return merged
+    # TF-IDF分数不能累加，需要完整重新加载
+    return None
+
+def get_snapshot_path(key):
+    """返回数据文件对应的快照路径"""
+    return os.path.join(SNAPSHOT_DIR, f"{key}.feather")
+
+def is_snapshot_fresh(filename, position):
+    """快照记录的读取位置正好是CSV当前的末尾（大小相同、末尾字节相同）时可以直接使用；CSV不存在时也使用快照
+    
+    不比较修改时间：保留时间戳的复制（rsync -t、cp -p）可能让新内容的修改时间早于快照。
+    """
+    current = get_read_position(filename)
+    if current is None:
+        return not os.path.exists(filename)
+    return (position is not None and current['offset'] == position['offset']
+            and current['anchor'] == position['anchor'])
+def get_aggregates_path(snapshot_path):
+    """文章快照旁边保存聚合结果（倒排索引、平台计数、每日和小时桶）的文件"""
+    return os.path.splitext(snapshot_path)[0] + '.aggregates.pkl'
+
+def write_aggregates(aggregates, snapshot_path, rows, position=None):
+    """原子写入与快照对应的聚合结果，记录行数和CSV读取位置用于校验；aggregates 为 None 时删除旧文件"""
+    aggregates_path = get_aggregates_path(snapshot_path)
+    try:
+        if aggregates is None:
+            if os.path.exists(aggregates_path):
+                os.remove(aggregates_path)
+            return
+        tmp_path = aggregates_path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            pickle.dump({'rows': rows, 'position': position, 'aggregates': aggregates}, f,
+                        protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, aggregates_path)
+    except Exception as e:
+        print(f"❌ Failed to write {aggregates_path}: {e}")
+
+def read_aggregates(snapshot_path, rows, position=None):
+    """读取与快照对应的聚合结果；文件不存在、或行数和读取位置与快照不一致时返回 None（需要重新构建）"""
+    aggregates_path = get_aggregates_path(snapshot_path)
+    try:
+        with metrics.timed('aggregates_load'), open(aggregates_path, 'rb') as f:
+            stored = pickle.load(f)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        print(f"❌ Failed to read {aggregates_path}: {e}")
+        return None
+    if stored['rows'] != rows or stored['position'] != position:
+        return None
+    return stored['aggregates']
+
+def write_snapshot(df, snapshot_path, position=None, aggregates=None):
+    """原子写入Feather快照（先写临时文件再替换），同时记录对应的CSV读取位置；文章快照同时写入聚合结果"""
+    try:
+        os.makedirs(os.path.dirname(snapshot_path) or '.', exist_ok=True)
+        # 共享全局词表的分类列只写入本表用到的类别
+        df = df.assign(**{column: df[column].cat.remove_unused_categories() for column in df.columns
+                          if isinstance(df[column].dtype, pd.CategoricalDtype)})
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        if position is not None:
+            table = table.replace_schema_metadata({
+                **(table.schema.metadata or {}),
+                b'source_position': json.dumps({**position, 'anchor': position['anchor'].hex()}).encode()
+            })
+        tmp_path = snapshot_path + '.tmp'
+        # 不压缩，读取时可以直接内存映射
+        feather.write_feather(table, tmp_path, compression='uncompressed')
+        os.replace(tmp_path, snapshot_path)
+        print(f"✅ Compiled {snapshot_path}")
+    except Exception as e:
+        print(f"❌ Failed to write {snapshot_path}: {e}")
+        aggregates = None
+    write_aggregates(aggregates, snapshot_path, len(df), position)
+
+def read_snapshot(snapshot_path):
+    """读取Feather快照，返回 (DataFrame, 对应的CSV读取位置)
+
+    文件是内存映射打开的，但 to_pandas 会把数据复制出来，常驻内存与从CSV加载相同；省下的是解析、清理和类型转换。
+    """
+    with metrics.timed('snapshot_load') as info:
+        table = feather.read_table(snapshot_path, memory_map=True)
+        df = table.to_pandas()
+        info['rows'], info['memory_bytes'] = len(df), frame_memory(df)
+    position = (table.schema.metadata or {}).get(b'source_position')
+    if position is not None:
+        position = json.loads(position)
+        position['anchor'] = bytes.fromhex(position['anchor'])
+    return df, position
+
+def compile_snapshots():
+    """将所有CSV编译为列式快照，返回已写入的快照路径"""
+    compiled = []
+    for key, filename in DATA_FILES.items():
+        if not os.path.exists(filename):
+            continue
+        snapshot_path = get_snapshot_path(key)
+        position = get_read_position(filename)
+        aggregates = None
+        if key == 'articles':
+            df, aggregates = load_articles_file(filename)
+        else:
+            df = prepare_data_file(key, load_data_file(key, filename))
+        position = mark_overlap(filename, position)
+        write_snapshot(df, snapshot_path, position, aggregates)
+        compiled.append(snapshot_path)
+    return compiled
+
+def load_prepared_data_file(key, filename):
+    """加载已清理的数据，返回 (DataFrame, CSV读取位置, 文章聚合结果或 None)
+    
+    快照较新时直接内存映射读取；CSV只被追加时读取快照并补上新增行；否则读取CSV并重新编译快照。
+    """
+    snapshot_path = get_snapshot_path(key)
+    if os.path.exists(snapshot_path):
+        try:
+            df, position = read_snapshot(snapshot_path)
+            if key in WORD_DATA_KEYS:
+                df, _ = intern_words(df)
+            # 文章的聚合结果与快照一起保存，不需要从头重建（与快照不一致时为 None，由 make_cache_entry 重建）
+            aggregates = read_aggregates(snapshot_path, len(df), position) if key == 'articles' else None
+            if is_snapshot_fresh(filename, position):
+                print(f"✅ Loaded {snapshot_path}")
+                return df, position, aggregates
+            appended = (read_appended_rows(filename, position, get_csv_columns(key))
+                        if position is not None else None)
+            if appended is not None:
+                delta, new_position = appended
+                delta = drop_seen_rows(key, df, prepare_data_file(key, normalize_data_frame(key, delta)), position)
+                position = new_position
+                # 只是修改时间变了或只有写了一半的行：数据不变，只更新读取位置
+                merged = merge_appended_rows(key, df, delta) if len(delta) else df
+                if merged is not None:
+                    if aggregates is not None:
+                        aggregates = update_article_aggregates(aggregates, delta, start=len(df))
+                    print(f"✅ Loaded {snapshot_path} + {len(delta)} appended rows from {filename}")
+                    write_snapshot(merged, snapshot_path, position, aggregates)
+                    return merged, position, aggregates
+        except Exception as e:
+            print(f"❌ Failed to read {snapshot_path}: {e}, falling back to {filename}")
+    
+    position = get_read_position(filename)
+    aggregates = None
+    if key == 'articles':
+        df, aggregates = load_articles_file(filename)
+    else:
+        df = prepare_data_file(key, load_data_file(key, filename))
+    position = mark_overlap(filename, position)
+    if position is not None:
+        write_snapshot(df, snapshot_path, position, aggregates)
+    return df, position, aggregates
+
+def get_file_signature(filename):
+    """返回文件签名 (绝对路径, 修改时间, 大小)，文件不存在时返回 None"""
+    try:
+        stat = os.stat(filename)
+    except OSError:
+        return None
+    return (os.path.abspath(filename), stat.st_mtime_ns, stat.st_size)
+
+@functools.cache
+def get_shared_cache():
+    """获取进程级共享缓存（所有会话共用同一份数据快照）"""
+    return {
+        'lock': threading.Lock(),
+        # (key, 文件签名) -> 缓存条目，按最近使用排序
+        'files': OrderedDict(),
+        # key -> 最新的 (key, 文件签名)
+        'latest': {},
+        'snapshot': None,
+        # 后台刷新线程的触发信号、首次加载完成信号和刷新进度
+        'trigger': threading.Event(),
+        'ready': threading.Event(),
+        'status': {'running': False, 'stage': 'Waiting', 'progress': 0.0, 'error': None, 'next_refresh': None}
+    }
+
+def make_cache_entry(key, df, position, aggregates=None):
+    """创建缓存条目：已清理的数据、内存占用（数据和聚合结果）、CSV读取位置和文章聚合结果"""
+    entry = {'data': df, 'bytes': frame_memory(df), 'position': position}
+    if key == 'articles':
+        # 文章加载时构建一次聚合结果（平台计数、关键词倒排索引、每日文章数、小时桶）
+        entry['aggregates'] = aggregates if aggregates is not None else update_article_aggregates(None, df)
+        entry['bytes'] += aggregates_memory(entry['aggregates'], len(df))
+    return entry
+
+def aggregates_memory(aggregates, rows):
+    """估计文章聚合结果的内存字节数：倒排索引的字典、单词和行号列表（每个行号一个指针，行号整数每行一个），
+    加上各个计数和小时桶的 memory_usage"""
+    total = rows * sys.getsizeof(10 ** 6)
+    for postings in aggregates['article_index'].values():
+        total += (sys.getsizeof(postings) + sum(map(sys.getsizeof, postings))
+                  + sum(map(sys.getsizeof, postings.values())))
+    for key in ['platform_counts', 'daily_counts', 'hourly_platforms', 'hourly_words']:
+        total += aggregates[key].memory_usage(deep=True)
+    return int(total)
+
+def ingest_appended_rows(key, filename, previous):
+    """增量读取：文件只被追加时只处理新增行，返回新的缓存条目；无法增量时返回 None"""
+    if previous is None or previous['position'] is None:
+        return None
+    appended = read_appended_rows(filename, previous['position'], get_csv_columns(key))
+    if appended is None:
+        return None
+    
+    delta, position = appended
+    df = previous['data']
+    delta = drop_seen_rows(key, df, prepare_data_file(key, normalize_data_frame(key, delta)), previous['position'])
+    if len(delta) == 0:
+        # 没有新的完整行（如只是 touch 或最后一行还没写完）：沿用原条目，只更新读取位置
+        return {**previous, 'position': position}
+    merged = merge_appended_rows(key, df, delta)
+    if merged is None:
+        return None
+    
+    aggregates = None
+    if key == 'articles':
+        aggregates = update_article_aggregates(previous['aggregates'], delta, start=len(df))
+    print(f"✅ Appended {len(delta)} rows from {filename}")
+    return make_cache_entry(key, merged, position, aggregates)
+
+def enforce_cache_limit(files, keep, max_bytes=CACHE_MAX_BYTES):
+    """按LRU淘汰旧版本文件数据，直到总内存不超过上限（当前快照使用的条目不淘汰）"""
+    total = sum(entry['bytes'] for entry in files.values())
+    for cache_key in list(files.keys()):
+        if total <= max_bytes:
+            break
+        if cache_key in keep:
+            continue
+        total -= files.pop(cache_key)['bytes']
+    if total > max_bytes:
+        print(f"⚠️ Data cache uses {total / 1024 ** 2:.1f} MB, above the {max_bytes / 1024 ** 2:.1f} MB limit")
+
+def build_top_words(word_data):
+    """预计算每个词表的top词汇"""
+    top_words = {}
+    with metrics.timed('topk_precompute') as info:
+        info['rows'] = 0
+        for data_type, df in word_data.items():
+            if df is None or len(df) == 0:
+                continue
+            info['rows'] += len(df)
+            if data_type.endswith('_combined'):
+                weight_col = 'combined_score'
+            else:
+                weight_col = 'frequency' if 'freq' in data_type else 'score'
+            top_words[data_type] = release_words(top_k_rows(df, weight_col, 20))
+    return top_words
+
+def build_analysis_data(data_files, article_aggregates=None):
+    """根据已清理的数据文件构建分析数据快照"""
+    if article_aggregates is None:
+        article_aggregates = update_article_aggregates(None, data_files.get('articles'))
+    
+    # 创建分析数据词典
+    analysis_data = {
+        'word_data': {
+            'content_freq': data_files.get('word_freq'),
+            'content_tfidf': data_files.get('tfidf'),
+            'title_freq': data_files.get('word_freq_title'),
+            'title_tfidf': data_files.get('tfidf_title'),
+            # frequency × TF-IDF 综合表，刷新时计算一次
+            'content_combined': build_combined_table(data_files.get('word_freq'), data_files.get('tfidf')),
+            'title_combined': build_combined_table(data_files.get('word_freq_title'), data_files.get('tfidf_title'))
+        },
+        'platform_data': data_files.get('articles'),
+        'article_index': article_aggregates['article_index'],
+        'daily_counts': article_aggregates['daily_counts'],
+        # 按小时预聚合的平台文章数和标题单词数，时间窗口查询只需对桶求和
+        'hourly_platforms': article_aggregates['hourly_platforms'],
+        'hourly_words': article_aggregates['hourly_words'],
+        'last_update': datetime.now(),
+        'top_words': None,
+        'top_platforms': None
+    }
+    analysis_data['top_words'] = build_top_words(analysis_data['word_data'])
+    
+    # top平台来自增量维护的平台计数
+    if analysis_data['platform_data'] is not None:
+        platform_counts = article_aggregates['platform_counts'].sort_values(ascending=False, kind='stable').reset_index()
+        platform_counts.columns = ['platform', 'count']
+        analysis_data['top_platforms'] = platform_counts
+    
+    return analysis_data
+
+def set_refresh_status(cache, **changes):
+    """整体替换刷新状态，读取方总能看到一致的状态"""
+    cache['status'] = {**cache['status'], **changes}
+
+def update_data_cache(cache=None):
+    """重建数据快照：进程内共享，只重新加载签名发生变化的文件，只被追加的文件只读取新增行
+    
+    由后台刷新线程调用；新快照准备好后整体替换，读取方在此之前继续使用旧快照。
+    """
+    cache = cache if cache is not None else get_shared_cache()
+    with cache['lock']:
+        set_refresh_status(cache, running=True, stage="Checking data files", progress=0.0, error=None)
+        data_files = {}
+        article_aggregates = None
+        current_keys = set()
+        changed = cache['snapshot'] is None
+        for i, (key, filename) in enumerate(DATA_FILES.items()):
+            cache_key = (key, get_file_signature(filename))
+            current_keys.add(cache_key)
+            entry = cache['files'].get(cache_key)
+            if entry is None:
+                set_refresh_status(cache, stage=f"Loading {filename}", progress=i / (len(DATA_FILES) + 1))
+                previous = cache['files'].get(cache['latest'].get(key))
+                entry = ingest_appended_rows(key, filename, previous)
+                if entry is None:
+                    entry = make_cache_entry(key, *load_prepared_data_file(key, filename))
+                cache['files'][cache_key] = entry
+                changed = True
+            cache['files'].move_to_end(cache_key)
+            cache['latest'][key] = cache_key
+            data_files[key] = entry['data']
+            if 'aggregates' in entry:
+                article_aggregates = entry['aggregates']
+        
+        enforce_cache_limit(cache['files'], current_keys)
+        
+        # 快照为只读对象，被所有会话共享，不要原地修改
+        if changed:
+            set_refresh_status(cache, stage="Building analysis data", progress=len(DATA_FILES) / (len(DATA_FILES) + 1))
+            cache['snapshot'] = build_analysis_data(data_files, article_aggregates)
+        set_refresh_status(cache, running=False, stage="Idle", progress=1.0)
+        return cache['snapshot']
+
+def refresh_worker(cache, image_cache):
+    """后台刷新线程：启动时、每隔CACHE_TTL或收到触发信号时重建快照并预渲染词云
+    
+    首次加载失败时页面没有数据可显示，不等待CACHE_TTL，而是从 REFRESH_RETRY_DELAY 开始退避重试。
+    """
+    retry_delay = REFRESH_RETRY_DELAY
+    while True:
+        try:
+            snapshot = update_data_cache(cache)
+            cache['ready'].set()
+            set_refresh_status(cache, running=True, stage="Rendering word clouds", progress=0.0)
+            rendered = prerender_wordclouds(snapshot, image_cache)
+            if rendered:
+                print(f"✅ Pre-rendered {rendered} word clouds")
+            set_refresh_status(cache, running=False, stage="Idle", progress=1.0)
+        except Exception as e:
+            print(f"❌ Data refresh failed: {e}")
+            set_refresh_status(cache, running=False, stage="Failed", error=str(e))
+        finally:
+            cache['ready'].set()
+        if cache['snapshot'] is None:
+            delay, retry_delay = retry_delay, min(retry_delay * 2, CACHE_TTL)
+        else:
+            delay, retry_delay = CACHE_TTL, REFRESH_RETRY_DELAY
+        set_refresh_status(cache, next_refresh=datetime.now() + delay)
+        cache['trigger'].wait(delay.total_seconds())
+        cache['trigger'].clear()
+
+@functools.cache
+def start_refresh_worker():
+    """每个进程只启动一次后台刷新线程"""
+    thread = threading.Thread(target=refresh_worker, args=(get_shared_cache(), get_image_cache()),
+                              name="data-refresh", daemon=True)
+    thread.start()
+    return thread
+
+def request_refresh():
+    """非阻塞地触发一次后台刷新"""
+    get_shared_cache()['trigger'].set()
+
+def extend_article_index(index, articles_df, start=0, copy=True):
+    """把文章加入倒排索引：平台 -> 单词 -> 文章行号列表（按行号递增）
+    
+    写时复制：返回新的索引，不修改传入的索引（旧快照仍在被读取）。
+    copy=False 时原地扩展，只用于还没有被共享的索引（例如分块加载时）。
+    """
+    index = dict(index) if copy else index
+    if articles_df is None or 'platform' not in articles_df.columns:
+        return index
+    
+    copied = set()
+    titles = articles_df['title'].tolist() if 'title' in articles_df.columns else [''] * len(articles_df)
+    for position, (platform, title) in enumerate(zip(articles_df['platform'].tolist(), titles), start):
+        if pd.isna(platform):
+            continue
+        if copy and platform not in copied:
+            index[platform] = dict(index.get(platform, {}))
+            copied.add(platform)
+        postings = index.setdefault(platform, {})
+        # 将标题分割成单词集合（只匹配完整单词）
+        for token in set(re.findall(r'\b\w+\b', str(title).lower())):
+            if copy and (platform, token) not in copied:
+                postings[token] = list(postings.get(token, []))
+                copied.add((platform, token))
+            postings.setdefault(token, []).append(position)
+    return index
+
+def build_article_index(articles_df):
+    """构建文章标题倒排索引：平台 -> 单词 -> 文章行号列表（按行号递增）"""
+    return extend_article_index({}, articles_df)
+
+def count_platforms(articles_df):
+    """统计每个平台的文章数"""
+    if articles_df is None or 'platform' not in articles_df.columns:
+        return pd.Series(dtype='int64', name='count')
+    with metrics.timed('platform_counts') as info:
+        counts = articles_df['platform'].value_counts(sort=False)
+        counts = counts[counts > 0]
+        counts.index = pd.Index(counts.index.tolist(), name='platform')
+        info['rows'] = len(articles_df)
+    return counts
+
+def count_daily(articles_df):
+    """统计每天发布的文章数"""
+    if articles_df is None or 'published_time' not in articles_df.columns:
+        return pd.Series(dtype='int64', name='count', index=pd.DatetimeIndex([], name='date'))
+    published = pd.to_datetime(articles_df['published_time'], errors='coerce')
+    counts = published.dt.floor('D').value_counts(sort=False)
+    counts.index.name = 'date'
+    return counts
+
+def empty_time_buckets(level):
+    """空的小时桶：(小时, 平台/单词) -> 计数"""
+    index = pd.MultiIndex.from_arrays([pd.DatetimeIndex([]), pd.Index([], dtype=object)], names=['hour', level])
+    return pd.Series(dtype='int64', index=index, name='count')
+
+def count_hourly(articles_df):
+    """按小时预聚合：(小时, 平台) 的文章数和 (小时, 单词) 的标题单词出现次数"""
+    platform_buckets, word_buckets = empty_time_buckets('platform'), empty_time_buckets('word')
+    if articles_df is None or 'published_time' not in articles_df.columns:
+        return platform_buckets, word_buckets
+    with metrics.timed('time_buckets') as info:
+        hours = pd.to_datetime(articles_df['published_time'], errors='coerce').dt.floor('h')
+        if 'platform' in articles_df.columns:
+            platforms = pd.DataFrame({'hour': hours, 'platform': articles_df['platform'].astype(object)}).dropna()
+            platform_buckets = platforms.groupby(['hour', 'platform']).size().rename('count')
+        if 'title' in articles_df.columns:
+            # 与倒排索引相同的分词方式，再去掉停用词和无效词
+            tokens = articles_df['title'].fillna('').astype(str).str.lower().str.findall(r'\b\w+\b')
+            words = pd.DataFrame({'hour': hours, 'word': tokens}).dropna(subset=['hour']).explode('word').dropna()
+            words = words[get_valid_word_mask(words['word'])]
+            word_buckets = words.groupby(['hour', 'word']).size().rename('count')
+        info['rows'] = len(articles_df)
+    return platform_buckets, word_buckets
+
+def add_time_buckets(buckets, delta):
+    """合并两组小时桶，结果按小时排序（窗口查询依赖排序）；用于增量追加，分块加载用 combine_time_buckets"""
+    return buckets.add(delta, fill_value=0).astype('int64').sort_index()
+
+def combine_time_buckets(parts, level):
+    """一次合并多块的小时桶并排序（逐块 add_time_buckets 每次都要重新对齐和排序整个累计结果）"""
+    if not parts:
+        return empty_time_buckets(level)
+    return pd.concat(parts).groupby(level=[0, 1]).sum().astype('int64').sort_index()
+
+def sum_time_buckets(buckets, start=None, end=None):
+    """对 [start, end) 内的小时桶按平台/单词求和（只扫描窗口内的桶，结果不排序）"""
+    hours = buckets.index.get_level_values('hour')
+    lo = 0 if start is None else hours.searchsorted(start)
+    hi = len(buckets) if end is None else hours.searchsorted(end)
+    window = buckets.iloc[lo:hi]
+    return window.groupby(level=1, sort=False).sum()
+
+def get_time_window(buckets, window, custom_range=None):
+    """把时间窗口选项换算为 [start, end)；All time 或没有数据时返回 None"""
+    if len(buckets) == 0:
+        return None
+    if window == "Custom":
+        if custom_range is None or len(custom_range) != 2:
+            return None
+        return pd.Timestamp(custom_range[0]), pd.Timestamp(custom_range[1]) + pd.Timedelta(days=1)
+    if TIME_WINDOWS.get(window) is None:
+        return None
+    # 以最新文章所在小时为终点，避免数据停止更新后窗口为空
+    end = buckets.index.get_level_values('hour')[-1] + pd.Timedelta(hours=1)
+    return end - TIME_WINDOWS[window], end
+
+def compare_time_windows(buckets, start, end, column):
+    """比较 [start, end) 与之前同样长度窗口的计数和变化量（结果不排序）"""
+    current = sum_time_buckets(buckets, start, end)
+    previous = sum_time_buckets(buckets, start - (end - start), start)
+    trend = pd.DataFrame({'count': current, 'previous': previous}).fillna(0).astype('int64')
+    trend['change'] = trend['count'] - trend['previous']
+    return trend.rename_axis(column).reset_index()
+
+def update_article_aggregates(aggregates, articles_df, start=0, copy=True, hourly=True):
+    """用新增文章更新聚合结果（平台计数、关键词倒排索引、每日文章数、小时桶），返回新的聚合结果
+    
+    hourly=False 时不更新小时桶（分块加载时由调用方收集每块的小时桶，最后一次合并）。
+    """
+    if aggregates is None:
+        aggregates = {'platform_counts': count_platforms(None), 'article_index': {}, 'daily_counts': count_daily(None),
+                      'hourly_platforms': empty_time_buckets('platform'), 'hourly_words': empty_time_buckets('word')}
+        copy = False
+    platform_counts = aggregates['platform_counts'].add(count_platforms(articles_df), fill_value=0).astype('int64')
+    daily_counts = aggregates['daily_counts'].add(count_daily(articles_df), fill_value=0).astype('int64').sort_index()
+    if hourly:
+        hourly_platforms, hourly_words = count_hourly(articles_df)
+        hourly_platforms = add_time_buckets(aggregates['hourly_platforms'], hourly_platforms)
+        hourly_words = add_time_buckets(aggregates['hourly_words'], hourly_words)
+    else:
+        hourly_platforms, hourly_words = aggregates['hourly_platforms'], aggregates['hourly_words']
+    with metrics.timed('article_index') as info:
+        article_index = extend_article_index(aggregates['article_index'], articles_df, start, copy)
+        info['rows'] = len(articles_df) if articles_df is not None else 0
+    return {
+        'platform_counts': platform_counts,
+        'article_index': article_index,
+        'daily_counts': daily_counts,
+        'hourly_platforms': hourly_platforms,
+        'hourly_words': hourly_words
+    }
+
+def get_article_filter_mask(articles_df, platforms=None, window_bounds=None):
+    """按平台和时间窗口 [start, end) 筛选文章的布尔掩码"""
+    mask = pd.Series(True, index=articles_df.index)
+    if platforms:
+        mask &= articles_df['platform'].isin(platforms)
+    if window_bounds is not None:
+        start, end = window_bounds
+        mask &= (articles_df['published_time'] >= start) & (articles_df['published_time'] < end)
+    return mask
+
+def iter_article_texts(column, articles_df, platforms=None, window_bounds=None):
+    """逐块返回筛选后的文章文本：标题来自内存中的文章表，正文从articles.csv流式读取"""
+    if articles_df is not None and column in articles_df.columns:
+        chunks = [articles_df]
+    else:
+        try:
+            chunks = pd.read_csv(DATA_FILES['articles'], chunksize=ARTICLE_CHUNK_ROWS,
+                                 usecols=lambda name: name in ['platform', 'published_time', column])
+        except FileNotFoundError:
+            return
+    for chunk in chunks:
+        chunk = normalize_data_frame('articles', chunk)
+        if column in chunk.columns:
+            yield chunk.loc[get_article_filter_mask(chunk, platforms, window_bounds), column].tolist()
+
+def compute_word_tables(column, articles_df, platforms=None, window_bounds=None, max_workers=ANALYTICS_WORKERS):
+    """从文章文本即时计算词频和TF-IDF，返回与CSV结构一致的 (word,count 表, word,score 表, 文章数)"""
+    matrix = TermMatrix()
+    for texts in iter_article_texts(column, articles_df, platforms, window_bounds):
+        matrix.add_texts(texts, max_workers)
+    # 矩阵局部词表上的有效词掩码，去掉停用词后再计算TF-IDF
+    keep = matrix.terms.mask('valid', get_valid_word_mask)
+    return word_counts(matrix, keep), tfidf_scores(matrix, keep), matrix.n_docs
+
+@functools.cache
+def get_live_cache():
+    """获取进程级即时计算结果缓存（LRU）"""
+    return {'lock': threading.Lock(), 'views': OrderedDict()}
+
+def get_live_word_view(data, data_type, platforms=None, window_bounds=None):
+    """按平台和时间窗口从文章即时计算词表，返回与快照结构相同的 word_data/top_words"""
+    prefix = 'content' if data_type == "Content Analysis" else 'title'
+    key = (data['last_update'], prefix, tuple(sorted(platforms or [])), window_bounds)
+    cache = get_live_cache()
+    with cache['lock']:
+        view = cache['views'].get(key)
+        if view is not None:
+            cache['views'].move_to_end(key)
+            return view
+    
+    # 计算可能需要几秒，不持有锁，其他会话的缓存命中不用等待（同一视图并发计算时保留先完成的结果）
+    freq_df, tfidf_df, n_articles = compute_word_tables(prefix, data['platform_data'], platforms, window_bounds)
+    freq_df = prepare_data_file('word_freq', normalize_data_frame('word_freq', freq_df))
+    tfidf_df = prepare_data_file('tfidf', tfidf_df)
+    word_data = {f'{prefix}_freq': freq_df, f'{prefix}_tfidf': tfidf_df,
+                 f'{prefix}_combined': build_combined_table(freq_df, tfidf_df)}
+    view = {'word_data': {**data['word_data'], **word_data},
+            'top_words': {**data['top_words'], **build_top_words(word_data)},
+            'articles': n_articles}
+    with cache['lock']:
+        view = cache['views'].setdefault(key, view)
+        cache['views'].move_to_end(key)
+        while len(cache['views']) > LIVE_CACHE_MAX_ITEMS:
+            cache['views'].popitem(last=False)
+    return view
+
+def get_articles_by_platform_and_words(platforms, top_words, articles_df, max_platforms=15, article_index=None):
+    """根据平台和关键词获取相关文章（使用倒排索引）"""
+    with metrics.timed('article_search') as info:
+        result = search_articles(platforms, top_words, articles_df, max_platforms, article_index)
+        info['rows'] = sum(len(articles) for articles in result.values())
+    return result
+
+def search_articles(platforms, top_words, articles_df, max_platforms, article_index):
+    """在倒排索引中查找每个top平台下标题包含top词汇的文章"""
+    result = {}
+    if article_index is None:
+        article_index = build_article_index(articles_df)
+    
+    # 获取top平台
+    top_platform_list = platforms.head(max_platforms)['platform'].tolist()
+    
+    # 获取top词汇
+    keyword_list = top_words['word'].tolist()
+    
+    has_title = 'title' in articles_df.columns
+    has_url = 'url' in articles_df.columns
+    
+    for platform in top_platform_list:
+        postings = article_index.get(platform, {})
+        
+        # 每篇文章记录按top词汇顺序第一个匹配的关键词
+        matched = {}
+        for keyword in keyword_list:
+            for position in postings.get(keyword.lower(), ()):
+                matched.setdefault(position, keyword)
+        
+        positions = sorted(matched)
+        titles = articles_df['title'].take(positions).tolist() if has_title else [''] * len(positions)
+        urls = articles_df['url'].take(positions).tolist() if has_url else [''] * len(positions)
+        relevant_articles = [
+            {'title': str(title), 'url': url, 'matched_keyword': matched[position]}
+            for position, title, url in zip(positions, titles, urls)
+        ]
+        
+        if relevant_articles:
+            result[platform] = relevant_articles
+    
+    return result
@@ -0,0 +1,20 @@
+"""常驻子进程池：词云渲染和文章分词共用同一个，服务进程里最多只有一组工作进程"""
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+import threading
+
+_pool = None
+_pool_workers = 0
+_pool_lock = threading.Lock()
+
+def get_process_pool(max_workers):
+    """获取常驻的进程池；需要的进程数比现有的多时重建，更少时直接复用（任务数决定实际并行度）"""
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is None or _pool_workers < max_workers:
+            if _pool is not None:
+                _pool.shutdown(wait=False)
+            # 服务进程是多线程的，fork可能死锁，子进程使用spawn启动
+            _pool = ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context('spawn'))
+            _pool_workers = max_workers
+        return _pool
@@ -0,0 +1,131 @@
+"""词云渲染：WordCloud布局 + matplotlib输出PNG（可在子进程中运行）
+
+matplotlib、WordCloud和PIL在第一次布局或渲染时才导入：只用到参数和进程池的进程（页面启动、批量导出的主进程）
+不需要付出它们的导入时间。
+"""
+import functools
+import io
+import os
+import time
+
+import metrics
+from pools import get_process_pool
+from topk import top_k_items
+
+# 词云布局参数
+WORDCLOUD_PARAMS = {
+    'width': 900, 'height': 450, 'background_color': 'white',
+    'colormap': 'viridis', 'relative_scaling': 0.5
+}
+
+# 预渲染词云的最大进程数（实际不超过一次渲染的词云数）
+WORDCLOUD_WORKERS = int(os.environ.get('DASHBOARD_WORDCLOUD_WORKERS', os.cpu_count() or 1))
+
+@functools.cache
+def get_pyplot():
+    """第一次渲染时导入matplotlib并设置字体"""
+    import matplotlib.pyplot as plt
+    # 设置matplotlib中文字体（避免警告）
+    plt.rcParams['font.family'] = ['DejaVu Sans']
+    plt.rcParams['axes.unicode_minus'] = False
+    return plt
+
+def layout_and_render(word_weights, title, figsize, max_words, previous=None):
+    """布局词云并通过matplotlib渲染为PNG字节
+
+    previous 为上一次的布局状态（用于保持词的位置），返回 (PNG字节, 布局状态, 布局耗时, 渲染耗时)。
+    """
+    from layout import layout_wordcloud
+    start = time.perf_counter()
+    # 只把会被画出的词交给WordCloud（它会对传入的整个词典排序）
+    word_weights = top_k_items(word_weights, max_words)
+    wordcloud, layout = layout_wordcloud(word_weights, max_words, previous, **WORDCLOUD_PARAMS)
+    layout_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    png = plot_png(wordcloud, title, figsize)
+    return png, layout, layout_seconds, time.perf_counter() - start
+
+def plot_png(wordcloud, title, figsize):
+    """用matplotlib把已布局的词云画成带标题的PNG字节（渲染后关闭figure）"""
+    plt = get_pyplot()
+    fig, ax = plt.subplots(figsize=figsize)
+    try:
+        ax.imshow(wordcloud, interpolation='bilinear')
+        ax.axis('off')
+        ax.set_title(title, fontsize=16, pad=20)
+        buffer = io.BytesIO()
+        fig.savefig(buffer, format='png', dpi=200, bbox_inches='tight')
+    finally:
+        plt.close(fig)
+    return buffer.getvalue()
+
+def layout_words(word_weights, max_words, previous=None):
+    """只运行WordCloud布局（不栅格化），供浏览器端绘制
+
+    返回 (每个词的权重、中心坐标、字号和颜色, 布局状态)。浏览器端的文字不能逐个旋转，所以只使用水平排列。
+    """
+    from PIL import ImageFont
+    from layout import layout_wordcloud
+    word_weights = top_k_items(word_weights, max_words)
+    start = time.perf_counter()
+    wordcloud, layout = layout_wordcloud(word_weights, max_words, previous,
+                                         **{**WORDCLOUD_PARAMS, 'prefer_horizontal': 1.0})
+    words = []
+    for (word, _), font_size, (row, column), _, color in wordcloud.layout_:
+        # 布局位置是文字左上角，换算为文字外框的中心
+        left, top, right, bottom = ImageFont.truetype(wordcloud.font_path, font_size).getbbox(word)
+        words.append({'word': word, 'weight': float(word_weights[word]), 'x': float(column + (left + right) / 2),
+                      'y': float(row + (top + bottom) / 2), 'size': font_size, 'color': color})
+    metrics.record('wordcloud_layout', time.perf_counter() - start, rows=len(word_weights))
+    return words, layout
+
+def record_render_timings(word_weights, layout_seconds, render_seconds):
+    """记录词云布局和matplotlib渲染的耗时（子进程中的耗时也在主进程记录）"""
+    metrics.record('wordcloud_layout', layout_seconds, rows=len(word_weights))
+    metrics.record('matplotlib_render', render_seconds)
+
+def render_wordcloud(word_weights, title, figsize, max_words, previous=None):
+    """布局词云并渲染为PNG字节，返回 (PNG字节, 布局状态)"""
+    png, layout, layout_seconds, render_seconds = layout_and_render(word_weights, title, figsize, max_words, previous)
+    record_render_timings(word_weights, layout_seconds, render_seconds)
+    return png, layout
+
+def export_wordcloud(word_weights, title, figsize, max_words, formats=('png',)):
+    """布局词云并导出为文件内容，返回 {格式: 字节}（批量导出用，可在子进程中运行）
+
+    png 与页面上的图片相同（带标题）；svg 由 WordCloud 直接输出矢量文字（不带标题）。
+    """
+    from layout import layout_wordcloud
+    word_weights = top_k_items(word_weights, max_words)
+    wordcloud, _ = layout_wordcloud(word_weights, max_words, **WORDCLOUD_PARAMS)
+    outputs = {}
+    if 'png' in formats:
+        outputs['png'] = plot_png(wordcloud, title, figsize)
+    if 'svg' in formats:
+        outputs['svg'] = wordcloud.to_svg().encode()
+    return outputs
+
+def render_wordclouds(jobs, max_workers=WORDCLOUD_WORKERS):
+    """并行渲染多个词云；jobs 为 render_wordcloud 的参数元组列表，按顺序返回 (PNG字节, 布局状态)"""
+    if not jobs:
+        return []
+    # 进程数不超过词云数（默认的CPU核数通常比一次刷新的6个词云多）
+    max_workers = min(max_workers, len(jobs))
+    if max_workers <= 1:
+        return [render_wordcloud(*job) for job in jobs]
+    results = []
+    for job, (png, layout, layout_seconds, render_seconds) in zip(
+            jobs, get_process_pool(max_workers).map(layout_and_render, *zip(*jobs))):
+        record_render_timings(job[0], layout_seconds, render_seconds)
+        results.append((png, layout))
+    return results
+
+def export_wordclouds(jobs, formats=('png',), max_workers=WORDCLOUD_WORKERS):
+    """并行导出多个词云；jobs 为 (词权重, 标题, figsize, max_words) 元组列表，按顺序返回 {格式: 字节}"""
+    if not jobs:
+        return []
+    max_workers = min(max_workers, len(jobs))
+    if max_workers <= 1:
+        return [export_wordcloud(*job, formats) for job in jobs]
+    return list(get_process_pool(max_workers).map(export_wordcloud, *zip(*jobs), [formats] * len(jobs)))
@@ -0,0 +1,49 @@
+"""测试共用设置：把仓库根目录加入导入路径，并提供临时数据目录"""
+import os
+import shutil
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+WORD_FILES = ['word_frequency.csv', 'word_frequency_title.csv', 'tfidf.csv', 'tfidf_title.csv']
+
+def make_articles(start, count, seed=0):
+    """生成与线上结构相同的文章行（id从 start 开始递增）"""
+    rng = np.random.default_rng(seed + start)
+    words = np.array(['market', 'energy', 'crisis', 'school', 'launch', 'policy', 'health', 'the', 'wind'])
+    platforms = np.array(['news.com', 'blog.org', 'forum.net', 'daily.co'])
+    ids = np.arange(start, start + count)
+    return pd.DataFrame({
+        'id': ids,
+        'country': 'US',
+        'platform': platforms[rng.integers(0, len(platforms), count)],
+        'published_time': (pd.Timestamp('2025-11-10') + pd.to_timedelta(ids * 997 % (7 * 24 * 3600), unit='s')
+                           ).strftime('%Y-%m-%d %H:%M:%S'),
+        'title': [' '.join(row) for row in words[rng.integers(0, len(words), (count, 5))]],
+        'content': 'lorem ipsum',
+        'url': [f'http://example.com/{i}' for i in ids],
+    })
+
+def append_csv(path, df):
+    """把行追加到CSV末尾（不写表头）"""
+    with open(path, 'a') as f:
+        f.write(df.to_csv(index=False, header=False))
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    """临时工作目录：四个词表CSV的副本和一个小的 articles.csv；每个测试使用新的进程级缓存"""
+    import pipeline
+    for filename in WORD_FILES:
+        shutil.copy(os.path.join(ROOT, filename), tmp_path / filename)
+    make_articles(0, 500).to_csv(tmp_path / 'articles.csv', index=False)
+    monkeypatch.chdir(tmp_path)
+    for cache in (pipeline.get_shared_cache, pipeline.get_image_cache, pipeline.get_live_cache):
+        cache.cache_clear()
+    yield tmp_path
+    for cache in (pipeline.get_shared_cache, pipeline.get_image_cache, pipeline.get_live_cache):
+        cache.cache_clear()
@@ -0,0 +1,97 @@
+"""增量读取：只 touch、最后一行写了一半、id不递增和加载期间被追加时的结果与完整构建一致"""
+import os
+
+import pandas as pd
+
+import pipeline
+from conftest import append_csv, make_articles
+
+def load_entry():
+    df, position, aggregates = pipeline.load_prepared_data_file('articles', 'articles.csv')
+    return pipeline.make_cache_entry('articles', df, position, aggregates)
+
+def assert_same_rows(df, expected):
+    assert list(df['id']) == list(expected['id'])
+    assert list(df['platform'].astype(str)) == list(expected['platform'].astype(str))
+
+def test_touch_keeps_entry(data_dir):
+    previous = load_entry()
+    os.utime('articles.csv', ns=(0, os.stat('articles.csv').st_mtime_ns + 10 ** 9))
+    entry = pipeline.ingest_appended_rows('articles', 'articles.csv', previous)
+    assert entry['data'] is previous['data']
+    assert entry['position'] == previous['position']
+
+def test_partial_trailing_line(data_dir):
+    previous = load_entry()
+    line = make_articles(500, 1).to_csv(index=False, header=False)
+    with open('articles.csv', 'a') as f:
+        f.write(line[:20])
+    entry = pipeline.ingest_appended_rows('articles', 'articles.csv', previous)
+    assert entry['data'] is previous['data']
+    assert entry['position']['offset'] == previous['position']['offset']
+
+    # 写完这一行后再次刷新只读到这一行
+    with open('articles.csv', 'a') as f:
+        f.write(line[20:])
+    entry = pipeline.ingest_appended_rows('articles', 'articles.csv', entry)
+    assert list(entry['data']['id'][-2:]) == [499, 500]
+    assert_same_rows(entry['data'], pipeline.load_articles_file('articles.csv')[0])
+
+def test_snapshot_path_with_touch_and_partial_line(data_dir):
+    pipeline.load_prepared_data_file('articles', 'articles.csv')
+    with open('articles.csv', 'a') as f:
+        f.write('500,US,news')
+    df, position, aggregates = pipeline.load_prepared_data_file('articles', 'articles.csv')
+    assert len(df) == 500 and aggregates is not None
+    assert pd.api.types.is_integer_dtype(df['id'])
+
+def test_ids_need_not_increase(data_dir):
+    previous = load_entry()
+    append_csv('articles.csv', make_articles(10_000, 5))
+    entry = pipeline.ingest_appended_rows('articles', 'articles.csv', previous)
+    append_csv('articles.csv', make_articles(100, 5).assign(id=range(9_000, 9_005)))
+    entry = pipeline.ingest_appended_rows('articles', 'articles.csv', entry)
+    assert len(entry['data']) == 510
+    assert_same_rows(entry['data'], pipeline.load_articles_file('articles.csv')[0])
+
+def test_rows_appended_during_load_are_not_duplicated(data_dir, monkeypatch):
+    load_articles_file = pipeline.load_articles_file
+
+    def racing_load(filename):
+        # 记录读取位置之后、读取完成之前追加的行：加载结果包含，增量读取还会再读到一次
+        append_csv(filename, make_articles(500, 3))
+        return load_articles_file(filename)
+
+    monkeypatch.setattr(pipeline, 'load_articles_file', racing_load)
+    previous = load_entry()
+    assert len(previous['data']) == 503 and previous['position']['overlap']
+    monkeypatch.setattr(pipeline, 'load_articles_file', load_articles_file)
+
+    entry = pipeline.ingest_appended_rows('articles', 'articles.csv', previous)
+    assert len(entry['data']) == 503 and 'overlap' not in entry['position']
+    append_csv('articles.csv', make_articles(503, 2))
+    entry = pipeline.ingest_appended_rows('articles', 'articles.csv', entry)
+    assert_same_rows(entry['data'], load_articles_file('articles.csv')[0])
+
+def load_word_freq():
+    df, position, _ = pipeline.load_prepared_data_file('word_freq', 'word_frequency.csv')
+    return pipeline.make_cache_entry('word_freq', df, position)
+
+def word_table(df):
+    return dict(zip(df['word'].astype(str), df['frequency']))
+
+def test_word_freq_incremental_matches_full_build(data_dir):
+    previous = load_word_freq()
+    first = previous['data'].iloc[0]
+    with open('word_frequency.csv', 'a') as f:
+        f.write(f"{first['word']},5\nzebra,3\nzebra,4\n")
+    entry = pipeline.ingest_appended_rows('word_freq', 'word_frequency.csv', previous)
+    incremental = word_table(entry['data'])
+    assert incremental[first['word']] == first['frequency'] + 5 and incremental['zebra'] == 7
+    assert len(incremental) == len(entry['data'])
+
+    # 删除快照后完整重新加载：重复的单词同样求和为一行
+    os.remove(pipeline.get_snapshot_path('word_freq'))
+    full = pipeline.load_prepared_data_file('word_freq', 'word_frequency.csv')[0]
+    assert len(full) == len(set(full['word'])) and word_table(full) == incremental
+    assert full['frequency'].dtype == entry['data']['frequency'].dtype
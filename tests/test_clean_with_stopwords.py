@@ -0,0 +1,60 @@
+"""clean_with_stopwords / get_valid_word_mask 与最初逐行检查的 is_valid_word 逐行一致"""
+import os
+import re
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import ROOT, WORD_FILES
+from pipeline import ENGLISH_STOPWORDS, clean_with_stopwords, get_valid_word_mask, is_english_word
+
+
+EDGE_WORDS = ['technology', 'word\n', 'word\n\n', '\nword', ' padded ', 'The', 'AND', 'Said', 'x', 'X', 'ab',
+              '--', "'s", '``', 'u.s.', 'U.S.', "don't", 'well-known', 'café', '2024', 'abc1', '', ' ',
+              np.nan, None, 123, 4.5, True]
+
+def is_valid_word(word):
+    """最初 clean_with_stopwords 中逐行检查的实现（参照）"""
+    if pd.isna(word) or not isinstance(word, str):
+        return False
+    word_clean = word.strip().lower()
+    if word_clean in ENGLISH_STOPWORDS:
+        return False
+    if not is_english_word(word):
+        return False
+    if len(word_clean) <= 1:
+        return False
+    if re.match(r'^[^\w\s]+$', word_clean):
+        return False
+    return True
+
+def assert_parity(words):
+    expected = words.apply(is_valid_word).astype(bool)
+    mask = get_valid_word_mask(words)
+    assert mask.tolist() == expected.tolist()
+
+    cleaned, removed = clean_with_stopwords(pd.DataFrame({'word': words, 'score': np.arange(len(words))}))
+    assert cleaned['score'].tolist() == np.flatnonzero(expected.to_numpy()).tolist()
+    assert list(map(str, cleaned['word'])) == [str(word) for word in words[expected]]
+    assert removed == len(words) - int(expected.sum())
+
+@pytest.mark.parametrize('filename', WORD_FILES)
+def test_data_files(filename):
+    assert_parity(pd.read_csv(os.path.join(ROOT, filename))['word'])
+
+@pytest.mark.parametrize('dtype', [object, 'str', 'string[pyarrow]', 'string[python]'])
+def test_string_dtypes(dtype):
+    words = [word for word in EDGE_WORDS if isinstance(word, str)] + [None]
+    assert_parity(pd.Series(words, dtype=dtype))
+
+def test_mixed_values():
+    assert_parity(pd.Series(EDGE_WORDS, dtype=object))
+
+def test_all_non_strings():
+    assert_parity(pd.Series([np.nan, 1, 2.5], dtype=object))
+
+def test_stopwords_in_any_case():
+    words = pd.Series(['the', 'The', 'THE', 'tHe', ' the ', 'the\n'], dtype=object)
+    assert_parity(words)
+    assert not get_valid_word_mask(words).any()
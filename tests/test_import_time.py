@@ -0,0 +1,21 @@
+"""导入管道和渲染模块时不加载重依赖（matplotlib、wordcloud、plotly.express 在第一次渲染/画图时才导入）"""
+import subprocess
+import sys
+
+import pytest
+
+from conftest import ROOT
+
+DEFERRED_MODULES = ['matplotlib', 'wordcloud', 'plotly.express']
+
+def get_imported_modules(module):
+    """在新进程中用 -X importtime 导入模块，返回导入过的所有模块名"""
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'], cwd=ROOT,
+                            capture_output=True, text=True, check=True)
+    return {line.split('|')[-1].strip() for line in result.stderr.splitlines() if line.startswith('import time:')}
+
+@pytest.mark.parametrize('module', ['pipeline', 'render', 'export'])
+def test_heavy_modules_are_deferred(module):
+    imported = get_imported_modules(module)
+    assert module in imported
+    assert [name for name in DEFERRED_MODULES if name in imported] == []
@@ -0,0 +1,20 @@
+"""渲染进程池的进程数不超过词云数"""
+from concurrent.futures import ThreadPoolExecutor
+
+import render
+
+def test_pool_is_capped_at_job_count(monkeypatch):
+    requested = []
+
+    def get_process_pool(max_workers):
+        requested.append(max_workers)
+        return ThreadPoolExecutor(max_workers)
+
+    monkeypatch.setattr(render, 'get_process_pool', get_process_pool)
+    monkeypatch.setattr(render, 'export_wordcloud', lambda *job: job[1])
+    jobs = [({'market': 1.0}, title, (8, 4), 10) for title in ['a', 'b', 'c']]
+    assert render.export_wordclouds(jobs, max_workers=16) == ['a', 'b', 'c']
+    assert requested == [3]
+    # 只有一个词云时在当前进程渲染，不启动进程池
+    assert render.export_wordclouds(jobs[:1], max_workers=16) == ['a']
+    assert requested == [3]
@@ -0,0 +1,87 @@
+"""get_articles_by_platform_and_words（倒排索引）与最初逐行 iterrows 的实现结果一致"""
+import re
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import pipeline
+from conftest import make_articles
+
+EDGE_TITLES = ['Energy crisis deepens', 'ENERGY prices', 'energy-policy debate', 'Well-known brands rally',
+               'Café culture in Paris', 'Crème brûlée recipe', 'Market update 2024', 'snake_case naming',
+               "Don't panic", 'The energy market', '', np.nan, 'nan values', '   ', 'Crisis? Energy!']
+EDGE_PLATFORMS = ['news.com', 'blog.org', np.nan, 'News.com', 'forum.net']
+EDGE_KEYWORDS = ['energy', 'Market', 'well-known', 'café', 'crème', '2024', 'snake_case', 'don', 'nan', 'crisis',
+                 'missing']
+
+def reference_search(platforms, top_words, articles_df, max_platforms=15):
+    """最初 app.py 中逐行检查的实现（参照）"""
+    result = {}
+    top_platform_list = platforms.head(max_platforms)['platform'].tolist()
+    keyword_list = top_words['word'].tolist()
+    for platform in top_platform_list:
+        platform_articles = articles_df[articles_df['platform'] == platform]
+        relevant_articles = []
+        for _, article in platform_articles.iterrows():
+            title = str(article.get('title', ''))
+            url = article.get('url', '')
+            title_words = re.findall(r'\b\w+\b', title.lower())
+            for keyword in keyword_list:
+                keyword_lower = keyword.lower()
+                if keyword_lower in title_words:
+                    relevant_articles.append({'title': title, 'url': url, 'matched_keyword': keyword})
+                    break
+        if relevant_articles:
+            result[platform] = relevant_articles
+    return result
+
+def normalize(result):
+    """缺失的 url（NaN）彼此不相等，比较前统一为 None"""
+    return {platform: [{**article, 'url': None if pd.isna(article['url']) else article['url']}
+                       for article in articles] for platform, articles in result.items()}
+
+def make_edge_articles(count=300, seed=0):
+    rng = np.random.default_rng(seed)
+    urls = [f'http://example.com/{i}' if i % 17 else np.nan for i in range(count)]
+    return pd.DataFrame({
+        'id': np.arange(count),
+        'platform': [EDGE_PLATFORMS[i] for i in rng.integers(0, len(EDGE_PLATFORMS), count)],
+        'published_time': pd.Timestamp('2025-11-10') + pd.to_timedelta(np.arange(count), unit='h'),
+        'title': [EDGE_TITLES[i] for i in rng.integers(0, len(EDGE_TITLES), count)],
+        'url': urls,
+    })
+
+def assert_parity(articles_df, keywords, article_index=None, max_platforms=15):
+    prepared = pipeline.prepare_data_file('articles', articles_df.copy())
+    platforms = pd.DataFrame({'platform': articles_df['platform'].dropna().unique().tolist() + ['absent.com']})
+    top_words = pd.DataFrame({'word': keywords})
+    expected = reference_search(platforms, top_words, prepared, max_platforms)
+    actual = pipeline.get_articles_by_platform_and_words(platforms, top_words, prepared, max_platforms,
+                                                         article_index)
+    assert normalize(actual) == normalize(expected)
+    return expected
+
+@pytest.mark.parametrize('keywords', [EDGE_KEYWORDS, EDGE_KEYWORDS[::-1], ['missing'], []])
+def test_edge_cases(keywords):
+    expected = assert_parity(make_edge_articles(), keywords)
+    if keywords == EDGE_KEYWORDS:
+        assert {article['matched_keyword'] for articles in expected.values() for article in articles} >= {
+            'energy', 'Market', 'café', 'crème', 'snake_case', 'don', 'nan'}
+
+def test_max_platforms():
+    assert_parity(make_edge_articles(), EDGE_KEYWORDS, max_platforms=2)
+
+def test_incremental_index():
+    """分两次扩展的倒排索引（增量追加的路径）结果相同"""
+    articles_df = pipeline.prepare_data_file('articles', make_edge_articles())
+    aggregates = pipeline.update_article_aggregates(None, articles_df.iloc[:120])
+    aggregates = pipeline.update_article_aggregates(aggregates, articles_df.iloc[120:], start=120)
+    assert_parity(make_edge_articles(), EDGE_KEYWORDS, aggregates['article_index'])
+
+def test_generated_articles(data_dir):
+    """分块加载得到的索引与参照实现一致"""
+    df, aggregates = pipeline.load_articles_file('articles.csv')
+    raw = make_articles(0, 500)
+    keywords = ['market', 'Energy', 'crisis', 'launch', 'the']
+    assert_parity(raw, keywords, aggregates['article_index'])
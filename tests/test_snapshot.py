@@ -0,0 +1,80 @@
+"""快照和一起保存的文章聚合结果：从快照加载（包括补上追加行）与从CSV完整构建的结果一致"""
+import os
+
+import pandas as pd
+
+import pipeline
+from conftest import append_csv, make_articles
+
+def assert_same_aggregates(actual, expected):
+    assert actual['article_index'] == expected['article_index']
+    for key in ['platform_counts', 'daily_counts', 'hourly_platforms', 'hourly_words']:
+        pd.testing.assert_series_equal(actual[key].sort_index(), expected[key].sort_index(), check_names=False,
+                                       check_freq=False)
+
+def full_build():
+    df, aggregates = pipeline.load_articles_file('articles.csv')
+    return df, aggregates
+
+def test_aggregates_saved_with_snapshot(data_dir):
+    pipeline.load_prepared_data_file('articles', 'articles.csv')
+    assert os.path.exists(pipeline.get_aggregates_path(pipeline.get_snapshot_path('articles')))
+
+    df, position, aggregates = pipeline.load_prepared_data_file('articles', 'articles.csv')
+    assert aggregates is not None
+    expected_df, expected = full_build()
+    assert len(df) == len(expected_df)
+    assert_same_aggregates(aggregates, expected)
+
+def test_snapshot_plus_appended_rows(data_dir):
+    pipeline.load_prepared_data_file('articles', 'articles.csv')
+    append_csv('articles.csv', make_articles(500, 120))
+    df, _, aggregates = pipeline.load_prepared_data_file('articles', 'articles.csv')
+    assert len(df) == 620 and aggregates is not None
+    assert_same_aggregates(aggregates, full_build()[1])
+
+    # 追加后写入的快照和聚合结果仍然一致
+    _, _, reloaded = pipeline.load_prepared_data_file('articles', 'articles.csv')
+    assert_same_aggregates(reloaded, full_build()[1])
+
+def test_mismatched_aggregates_are_ignored(data_dir):
+    snapshot_path = pipeline.get_snapshot_path('articles')
+    df, position, aggregates = pipeline.load_prepared_data_file('articles', 'articles.csv')
+    pipeline.write_aggregates(aggregates, snapshot_path, len(df) + 1, position)
+    assert pipeline.load_prepared_data_file('articles', 'articles.csv')[2] is None
+
+def test_update_data_cache_from_snapshot(data_dir):
+    from_csv = pipeline.update_data_cache()
+    pipeline.get_shared_cache.cache_clear()
+    from_snapshot = pipeline.update_data_cache()
+    assert from_snapshot['article_index'] == from_csv['article_index']
+    pd.testing.assert_frame_equal(from_snapshot['top_platforms'], from_csv['top_platforms'])
+
+def test_rewritten_csv_with_older_mtime_is_reloaded(data_dir):
+    pipeline.update_data_cache()
+    snapshot_mtime = os.stat(pipeline.get_snapshot_path('word_freq')).st_mtime_ns
+    # 新内容的修改时间早于快照（如 rsync -t / cp -p 的结果）
+    pd.DataFrame({'word': ['quantum', 'harbor'], 'count': [50, 40]}).to_csv('word_frequency.csv', index=False)
+    os.utime('word_frequency.csv', ns=(snapshot_mtime - 10 ** 9, snapshot_mtime - 10 ** 9))
+
+    data = pipeline.update_data_cache()
+    assert sorted(data['word_data']['content_freq']['word'].astype(str)) == ['harbor', 'quantum']
+
+def test_fresh_snapshot_is_used(data_dir):
+    pipeline.load_prepared_data_file('tfidf', 'tfidf.csv')
+    os.utime('tfidf.csv')
+    assert pipeline.is_snapshot_fresh('tfidf.csv', pipeline.read_snapshot(pipeline.get_snapshot_path('tfidf'))[1])
+    with open('tfidf.csv', 'a') as f:
+        f.write('zebra,0.5\n')
+    assert not pipeline.is_snapshot_fresh('tfidf.csv',
+                                          pipeline.read_snapshot(pipeline.get_snapshot_path('tfidf'))[1])
+
+def test_chunked_load_matches_single_chunk(data_dir, monkeypatch):
+    _, expected = full_build()
+    monkeypatch.setattr(pipeline, 'ARTICLE_CHUNK_ROWS', 70)
+    df, aggregates = full_build()
+    assert len(df) == 500
+    assert_same_aggregates(aggregates, expected)
+    for key in ['hourly_platforms', 'hourly_words']:
+        assert aggregates[key].index.is_monotonic_increasing
+        assert aggregates[key].dtype == expected[key].dtype
@@ -0,0 +1,46 @@
+"""共享全局词表：离开管道的表不携带整个词表，内存统计不按表重复计算共享的类别"""
+import pandas as pd
+
+import metrics
+import pipeline
+from vocab import Vocabulary
+
+def test_top_words_are_plain_strings(data_dir):
+    data = pipeline.update_data_cache()
+    for key, top_words in data['top_words'].items():
+        assert not isinstance(top_words['word'].dtype, pd.CategoricalDtype), key
+        word_table = data['word_data'][key]
+        assert list(top_words['word']) == list(word_table.loc[top_words.index, 'word'].astype(str))
+
+def test_shared_categories_are_not_counted_per_table():
+    vocabulary = Vocabulary()
+    ids = vocabulary.encode([f'word{i}' for i in range(10_000)])
+    df = pd.DataFrame({'word': vocabulary.categorical(ids[:10]), 'count': range(10)})
+    assert vocabulary.is_shared(df['word'].dtype)
+    assert vocabulary.is_shared(df[df['count'] > 5]['word'].dtype)
+    shared = metrics.frame_memory(df, vocabulary.is_shared)
+    assert shared < 1024 < metrics.frame_memory(df)
+    # 表自己的分类列（如平台）照常计算
+    platforms = pd.DataFrame({'platform': pd.Categorical(['a', 'b'])})
+    assert not vocabulary.is_shared(platforms['platform'].dtype)
+    assert metrics.frame_memory(platforms, vocabulary.is_shared) == metrics.frame_memory(platforms)
+
+def test_encode_categorical_column_matches_strings():
+    vocabulary = Vocabulary()
+    words = pd.Series(['b', 'a', 'c', 'a', None], dtype='str')
+    expected = vocabulary.encode(words.tolist())
+    assert list(vocabulary.encode_column(words.astype('category'))) == list(expected)
+
+def test_term_matrix_only_interns_output_words():
+    from analytics import TermMatrix, tfidf_scores, word_counts
+
+    vocabulary = Vocabulary()
+    matrix = TermMatrix(vocabulary)
+    matrix.add_texts(['The market and the energy crisis', 'Energy policy http www xqzt'], max_workers=1)
+    keep = matrix.terms.mask('valid', pipeline.get_valid_word_mask)
+    counts, scores = word_counts(matrix, keep), tfidf_scores(matrix, keep)
+    assert dict(zip(counts['word'], counts['count']))['energy'] == 2
+    assert 'the' not in set(counts['word']) and set(counts['word']) == set(scores['word'])
+    # 全局词表里只有输出的单词，停用词和其他分词结果只在矩阵的局部词表里
+    assert sorted(vocabulary.words) == sorted(counts['word'])
+    assert 'the' in matrix.terms.ids
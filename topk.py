@@ -0,0 +1,36 @@
+"""共享的top-k工具：只做部分排序（numpy.argpartition / 堆），不对整个词表排序"""
+import heapq
+from operator import itemgetter
+
+import numpy as np
+
+def top_k_positions(values, k):
+    """返回最大的k个值的位置，按值降序排列
+
+    值相同时位置靠前的优先（与 nlargest(keep='first') 和稳定排序一致），忽略NaN。
+    """
+    values = np.asarray(values)
+    if values.dtype.kind not in 'if':
+        values = values.astype(np.float64)
+    candidates = np.flatnonzero(~np.isnan(values)) if values.dtype.kind == 'f' else np.arange(len(values))
+    if k <= 0 or len(candidates) == 0:
+        return np.array([], dtype=np.intp)
+    if k < len(candidates):
+        candidate_values = values[candidates]
+        # 第k大的值作为阈值：大于阈值的全部保留，等于阈值的按位置补足k个
+        threshold = np.partition(candidate_values, len(candidates) - k)[len(candidates) - k]
+        above = candidates[candidate_values > threshold]
+        ties = candidates[candidate_values == threshold][:k - len(above)]
+        candidates = np.sort(np.concatenate([above, ties]))
+    order = np.argsort(-values[candidates], kind='stable')
+    return candidates[order]
+
+def top_k_rows(df, column, k):
+    """DataFrame中 column 最大的k行，按降序排列（等价于 df.nlargest(k, column)）"""
+    return df.iloc[top_k_positions(df[column].to_numpy(), k)]
+
+def top_k_items(mapping, k):
+    """字典中值最大的k项（堆选择），按值降序返回新字典；值相同时保持原顺序"""
+    if len(mapping) <= k:
+        return dict(sorted(mapping.items(), key=itemgetter(1), reverse=True))
+    return dict(heapq.nlargest(k, mapping.items(), key=itemgetter(1)))
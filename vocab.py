@@ -0,0 +1,98 @@
+"""全局共享词表：每个单词只保存一次（interned），用int32词号表示
+
+词表只追加不删除，词号一旦分配就不再改变，所以不同时间、不同数据集得到的词号可以直接比较，
+按词号对齐的NumPy数组之间的连接就是数组索引。
+"""
+import sys
+import threading
+import weakref
+
+import numpy as np
+import pandas as pd
+
+class Vocabulary:
+    """单词 <-> int32词号 的双向映射，以及按词号预先计算的布尔掩码（如停用词）"""
+
+    def __init__(self):
+        self.ids = {}
+        self.words = []
+        self.masks = {}
+        self.lock = threading.Lock()
+        self._dtype = None
+        # 生成过的类别索引（按 id），用于识别共享词表的分类列
+        self._categories = weakref.WeakValueDictionary()
+
+    def clear(self):
+        """清空词表和掩码；之前分配的词号全部失效，只用于基准测试在同一进程中模拟冷启动"""
+        with self.lock:
+            self.ids, self.words, self.masks, self._dtype = {}, [], {}, None
+
+    def __len__(self):
+        return len(self.words)
+
+    def encode(self, words):
+        """单词序列 -> int32词号数组，新单词追加到词表；非字符串（缺失值）的词号为 -1"""
+        ids = np.empty(len(words), dtype=np.int32)
+        with self.lock:
+            for i, word in enumerate(words):
+                term_id = self.ids.get(word)
+                if term_id is None:
+                    if not isinstance(word, str):
+                        ids[i] = -1
+                        continue
+                    word = sys.intern(word)
+                    term_id = self.ids[word] = len(self.words)
+                    self.words.append(word)
+                ids[i] = term_id
+        return ids
+
+    def encode_column(self, column):
+        """单词列 -> 词号数组；共享词表的分类列直接取编码，其他分类列只查一次各个类别"""
+        if isinstance(column.dtype, pd.CategoricalDtype):
+            codes = column.cat.codes.to_numpy()
+            if column.dtype is self._dtype:
+                return codes.astype(np.int32)
+            # 先转成Python列表再逐个查询（直接迭代Arrow字符串索引要慢好几倍）
+            category_ids = np.append(self.encode(column.cat.categories.tolist()), np.int32(-1))
+            return category_ids[codes]
+        return self.encode(column.tolist())
+
+    def dtype(self):
+        """以整个词表为类别的分类类型，词表增长前所有词表共享同一个"""
+        with self.lock:
+            if self._dtype is None or len(self._dtype.categories) != len(self.words):
+                self._dtype = pd.CategoricalDtype(pd.Index(self.words, dtype=object))
+                self._categories[id(self._dtype.categories)] = self._dtype.categories
+            return self._dtype
+
+    def is_shared(self, dtype):
+        """是否是以本词表（某个时刻的全部单词）为类别的分类类型"""
+        if not isinstance(dtype, pd.CategoricalDtype):
+            return False
+        return self._categories.get(id(dtype.categories)) is dtype.categories
+
+    def categorical(self, ids):
+        """词号数组 -> 单词分类列（类别是共享的全局词表，每行只保存编码）"""
+        return pd.Categorical.from_codes(ids, dtype=self.dtype())
+
+    def mask(self, name, predicate):
+        """按词号的布尔数组，predicate 只对上次计算后新增的单词整列计算一次"""
+        with self.lock:
+            mask = self.masks.get(name, np.zeros(0, dtype=bool))
+            words = self.words[len(mask):]
+        if words:
+            start = len(mask)
+            added = np.asarray(predicate(pd.Series(words, dtype=object)), dtype=bool)
+            with self.lock:
+                # 其他线程可能已经补上了一部分，只追加还没有的
+                mask = self.masks.get(name, mask)
+                if len(mask) < start + len(added):
+                    mask = self.masks[name] = np.concatenate([mask, added[len(mask) - start:]])
+        return mask
+
+    def lookup(self, ids, mask):
+        """按词号查询掩码，词号为 -1 时返回 False"""
+        return np.where(ids >= 0, mask[np.maximum(ids, 0)], False) if len(mask) else np.zeros(len(ids), dtype=bool)
+
+# 进程内唯一的全局词表（所有数据集、快照和即时计算共用）
+VOCABULARY = Vocabulary()